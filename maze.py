@@ -1,21 +1,38 @@
 
 import random
 import logging
+import itertools
+from array import array
 if __name__ == '__main__': 
 	#logging.basicConfig(level=logging.INFO)
-	logging.basicConfig(level=logging.DEBUG)	# turns on verbose logging and stepped output
+	logging.basicConfig(level=logging.DEBUG)	# turns on verbose logging (pass a stepHook to the generator for stepped output)
 
 
 # enumerated type for directions with respect to cells
 north, east, south, west = range(4)	
 directions = [north, south, east, west]
 
+# indexed by direction: the direction facing back the other way, and the (row, col) change to
+# get to the next cell that way
+reverseDirections = [south, west, north, east]
+steps = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+directionOfStep = dict([(step, direction) for direction, step in enumerate(steps)])
+
+noNeighbour = -1		# in a neighbour table, for a direction that leads off the edge - see Maze.neighbourTable
+
 # things that the edge of a cell can have
 wall, permanentwall, passage = range(3)
 blocked = [wall, permanentwall]
 
+# the characters a cell uses to draw its south and east edges in ASCII art, indexed by the kind of edge
+asciiSouth = ['_', '_', ' ']
+asciiEast  = ['|', '|', '_']
+
 
 class Maze(object):
+	changeCount = 0		# goes up each time passages are opened, so anything built from the walls can tell it's out of date
+	neighbours = None		# the neighbour table, once it's been asked for
+
 	def __init__(self, height, width):
 		self.height = height
 		self.width = width
@@ -23,10 +40,16 @@ class Maze(object):
 		# list comprehension, creates new rows with 'width' cells, once for each 'height'
 		self.cells = [[Cell(row, col, self) for col in range(width)] for row in range(height)]
 		
-		# set maze edges to permanentwall
+		self.setEdgesToPermanentWalls()
+					
+		# by default, start is upper left and finish is lower right
+		self.startCell = self.cells[0][0]
+		self.finishCell = self.cells[self.height - 1][self.width - 1]
+		
+	def setEdgesToPermanentWalls(self):
 		# TODO now that cells know their position, can this move to init or somewhere else?
-		for rownum in [0, height - 1]:
-			for colnum in [0, width - 1]:
+		for rownum in [0, self.height - 1]:
+			for colnum in [0, self.width - 1]:
 				if rownum == 0:
 					self.cells[rownum][colnum].walls[north] = permanentwall
 				if rownum == self.height - 1:
@@ -35,11 +58,38 @@ class Maze(object):
 					self.cells[rownum][colnum].walls[west]  = permanentwall 
 				if colnum == self.width - 1:
 					self.cells[rownum][colnum].walls[east]  = permanentwall
-					
-		# by default, start is upper left and finish is lower right
-		self.startCell = self.cells[0][0]
-		self.finishCell = self.cells[self.height - 1][self.width - 1]
-		
+
+	def wallsChanged(self):
+		"""call after changing walls other than through Cell.openPassageInDirection, which calls it for you"""
+		self.changeCount += 1
+
+	def iterCells(self, top=0, left=0, height=None, width=None):
+		"""Yields the cells a row at a time, left to right, without building a list of them. Give the top left corner and size of a region to yield just the cells in it (the size defaults to the rest of the maze)."""
+		bottom, right = self.regionBounds(top, left, height, width)
+		if (top, left, bottom, right) == (0, 0, self.height, self.width):
+			return itertools.chain.from_iterable(self.cells)
+		return self.iterRegionCells(top, left, bottom, right)
+
+	def iterRegionCells(self, top, left, bottom, right):
+		for row in xrange(top, bottom):
+			rowCells = self.cells[row]
+			for col in xrange(left, right):
+				yield rowCells[col]
+
+	def iterOrdinals(self, top=0, left=0, height=None, width=None):
+		"""Like iterCells, but yields the cells' ordinals."""
+		bottom, right = self.regionBounds(top, left, height, width)
+		if left == 0 and right == self.width:
+			return iter(xrange(top * self.width, bottom * self.width))		# whole rows are one run of ordinals
+		return itertools.chain.from_iterable([xrange(row * self.width + left, row * self.width + right) for row in xrange(top, bottom)])
+
+	def regionBounds(self, top, left, height, width):
+		"""returns the (bottom, right) row and column just past a region, raising ValueError if it doesn't fit in the maze"""
+		if height == None: height = self.height - top
+		if width == None: width = self.width - left
+		if top < 0 or left < 0 or height < 0 or width < 0 or top + height > self.height or left + width > self.width:
+			raise ValueError('a %sx%s region at (%s, %s) is outside the %sx%s maze' % (height, width, top, left, self.height, self.width))
+		return top + height, left + width
 
 	def cellPositionToOrdinal(self, row, col):
 		"""returns a single number that identifies the cell"""
@@ -52,30 +102,58 @@ class Maze(object):
 		return (row, col)
 	
 	def ordinalToCell(self, ordinal):
-		row, col = self.ordinalToCellPosition(ordinal)
+		row, col = divmod(ordinal, self.width)
 		return self.cells[row][col]
 		
 	def isCellPositionInMaze(self, row, col):
-		if (row < 0) or (row >= self.height) or (col < 0) or (col >= self.width):
-			return False
-		else:
-			return True
+		return 0 <= row < self.height and 0 <= col < self.width
+
+	def neighbourTable(self):
+		"""Returns the ordinals of every cell's neighbours in one flat array: the neighbour in 'direction' from 'ordinal' is at [4 * ordinal + direction], or noNeighbour if that's off the edge. It's built the first time it's asked for."""
+		if self.neighbours == None:
+			self.neighbours = makeNeighbourTable(self.height, self.width)
+		return self.neighbours
+
+	def neighbourOrdinal(self, ordinal, direction):
+		"""returns the ordinal of the cell next to 'ordinal' in 'direction', or noNeighbour if that's off the edge"""
+		return (self.neighbours or self.neighbourTable())[4 * ordinal + direction]
 
 	@classmethod
 	def reverseOf(self, direction):
-		return {east:  west,
-    			west:  east,
-			    north: south,
-			    south: north}[direction]
+		return reverseDirections[direction]
 
 	# return an ASCII art version of the maze
 	def __str__(self):	
-		s  = ' ' + '_'*((self.width * 2) - 1) + ' \n'			# header row, just '_'
+		return ''.join(self.iterAsciiLines())
+
+	def iterAsciiLines(self):
+		"""Yields the ASCII art version of the maze a line at a time (each ending in '\\n'), so big mazes can be written out without building the whole string."""
+		yield ' ' + '_'*((self.width * 2) - 1) + ' \n'			# header row, just '_'
 		for row in self.cells:
-			s += '|' + ''.join([str(s) for s in row]) + '\n'	# let each cell draw itself, and create a string from the resulting list
+			# the same two characters each cell draws for itself in Cell.__str__, but looked up rather than built per cell
+			yield '|' + ''.join([asciiSouth[cell.walls[south]] + asciiEast[cell.walls[east]] for cell in row]) + '\n'
 
-		return s
+	def writeAscii(self, stream):
+		"""writes the ASCII art version of the maze to the file-like 'stream', a line at a time"""
+		for line in self.iterAsciiLines():
+			stream.write(line)
 		
+	def packedWalls(self):
+		"""returns the walls of every cell packed into a bytearray, one byte per cell in ordinal order - see CompactMaze for the layout"""
+		return bytearray([packWalls(cell.walls) for cell in self.iterCells()])
+
+	def packedRegionWalls(self, top=0, left=0, height=None, width=None):
+		"""Like packedWalls, but for just the cells in a region (given as for iterCells), a row after another."""
+		bottom, right = self.regionBounds(top, left, height, width)
+		if (top, left, bottom, right) == (0, 0, self.height, self.width):
+			return self.packedWalls()
+		return bytearray([packWalls(cell.walls) for cell in self.iterRegionCells(top, left, bottom, right)])
+
+	def blockedFlags(self, direction, top=0, left=0, height=None, width=None):
+		"""Returns a bytearray with a byte for each cell in a region (given as for iterCells - the whole maze by default), a row after another: 1 where the cell's wall in 'direction' is blocked, 0 where it's a passage. Renderers and the like can then work a row or a column at a time with slices, instead of asking each cell."""
+		bottom, right = self.regionBounds(top, left, height, width)
+		return bytearray([cell.walls[direction] in blocked for cell in self.iterRegionCells(top, left, bottom, right)])
+
 
 class Cell(object):
 	def __init__(self, row, col, maze=None, northWall=wall, eastWall=wall, southWall=wall, westWall=wall):
@@ -86,7 +164,8 @@ class Cell(object):
 		
 	def openPassageInDirection(self, direction):
 		self.walls[direction] = passage
-		self.getAdjacentCell(direction).walls[Maze.reverseOf(direction)] = passage
+		self.getAdjacentCell(direction).walls[reverseDirections[direction]] = passage
+		self.maze.wallsChanged()
 		# TODO check for impassible edges instead of assuming it's ok to set a passage no matter what		
 		
 	def openPassageToCell(self, destinationCell):
@@ -95,28 +174,22 @@ class Cell(object):
 		# TODO check for non-adjacent destination cell
 		
 	def getDirectionOfAdjacentCell(self, adjacentCell):
-		rowDiff, colDiff = adjacentCell.row - self.row, adjacentCell.col - self.col
-		return {(-1, 0): north,
-				( 0, 1): east,
-				( 1, 0): south,
-				( 0,-1): west}[(rowDiff, colDiff)]	# it would be nice if I could reuse this dict, in reverse, so I don't duplicate it in getAdjacentCell
+		return directionOfStep[(adjacentCell.row - self.row, adjacentCell.col - self.col)]
 	
 	def getAdjacentCell(self, direction):
-		rowChange, colChange = {north: (-1, 0),
-								east:  ( 0, 1),
-								south: ( 1, 0),
-								west:  ( 0,-1)}[direction]
-		newRow, newCol = self.row + rowChange, self.col + colChange
-
-		# ('-1' indexes backwards, so we can't just catch IndexError and return None)
-		if self.maze.isCellPositionInMaze(newRow, newCol):
-			return self.maze.cells[newRow][newCol]
-		else:
-			return None
+		"""returns the cell next to this one in 'direction', or None if that's off the edge of the maze"""
+		# a cell knows its row and column, so stepping those is quicker than a trip through the ordinals and Maze.neighbourTable
+		rowStep, colStep = steps[direction]
+		row, col = self.row + rowStep, self.col + colStep
+		maze = self.maze
+		if 0 <= row < maze.height and 0 <= col < maze.width:
+			return maze.cells[row][col]
+		return None
 		# TODO since this relies on self.maze, check for it and raise appropriate exception if there's no maze
 	
 	def getAllAdjacentCells(self):
-		return [self.getAdjacentCell(direction) for direction in directions if self.getAdjacentCell(direction) != None]
+		adjacentCells = [self.getAdjacentCell(direction) for direction in directions]
+		return [cell for cell in adjacentCells if cell is not None]
 
 	def getAllAdjacentUnblockedCells(self):
 		return [self.getAdjacentCell(direction) for direction in directions if self.walls[direction] not in blocked]
@@ -158,6 +231,196 @@ class Cell(object):
 	def __repr__(self):
 		return '<Cell at [%s][%s]>' % (self.row, self.col)
 
+# CompactMaze is a Maze that keeps its wall state in a single bytearray instead of a Cell object
+# per position: one byte per cell (in ordinal order), with two bits for each direction's wall,
+# passage, etc. at bit (2 * direction). Cells are created on demand as views onto that byte, so
+# code written against Maze and Cell - cells[row][col], walls[direction], openPassageInDirection,
+# str() - works unchanged, but a big maze costs a byte per cell rather than hundreds.
+def packWalls(walls):
+	"""returns the one-byte packed form of a cell's four walls"""
+	return walls[north] | (walls[east] << 2) | (walls[south] << 4) | (walls[west] << 6)
+
+def unpackWall(packed, direction):
+	return (packed >> (2 * direction)) & 3
+
+def makeNeighbourTable(height, width):
+	"""builds the table Maze.neighbourTable returns, a direction at a time rather than a cell at a time"""
+	cellCount = height * width
+	table = array('l', [noNeighbour]) * (4 * cellCount)
+	table[4 * width + north::4] = array('l', xrange(cellCount - width))		# every row but the top one has a row above it
+	table[south:4 * (cellCount - width):4] = array('l', xrange(width, cellCount))
+	table[east::4] = array('l', xrange(1, cellCount + 1))
+	table[4 * (width - 1) + east::4 * width] = array('l', [noNeighbour]) * height		# ...and then the east edge is cut off
+	table[west::4] = array('l', xrange(-1, cellCount - 1))
+	table[west::4 * width] = array('l', [noNeighbour]) * height
+	return table
+
+def calculateNeighbourOrdinal(maze, ordinal, direction):
+	"""Maze.neighbourOrdinal worked out rather than looked up - for mazes kept at a byte or so per cell, where a table would be many times the size of the maze."""
+	row, col = divmod(ordinal, maze.width)
+	rowStep, colStep = steps[direction]
+	if 0 <= row + rowStep < maze.height and 0 <= col + colStep < maze.width:
+		return ordinal + rowStep * maze.width + colStep
+	return noNeighbour
+
+# each packed wall byte as a cell's list of walls, to copy
+unpackedWalls = [[unpackWall(packed, direction) for direction in range(4)] for packed in range(256)]
+
+# translation tables, one per direction, from a packed byte to 1 if the wall that way is blocked and 0 if it's a passage
+packedBlocked = [''.join([chr(unpackWall(packed, direction) in blocked) for packed in range(256)]) for direction in range(4)]
+
+# translation tables from a packed byte to the character drawn for its south or east edge
+packedAsciiSouth = ''.join([asciiSouth[wall if unpackWall(packed, south) in blocked else passage] for packed in range(256)])
+packedAsciiEast  = ''.join([asciiEast[wall if unpackWall(packed, east) in blocked else passage] for packed in range(256)])
+
+def asciiLineForPackedRow(rowBytes):
+	"""returns the line of ASCII art for a row of cells, given their packed wall bytes"""
+	line = bytearray(len(rowBytes) * 2)
+	line[0::2] = rowBytes.translate(packedAsciiSouth)
+	line[1::2] = rowBytes.translate(packedAsciiEast)
+	return '|' + str(line) + '\n'
+
+class CompactMaze(Maze):
+	def __init__(self, height, width, wallBytes=None):
+		"""'wallBytes', if given, is the packed walls of an existing maze (e.g. from packedWalls) - it's copied rather than shared"""
+		self.height = height
+		self.width = width
+		self.cells = CompactRows(self)
+		if wallBytes != None:
+			if len(wallBytes) != height * width:
+				raise ValueError('expected %s bytes of walls for a %sx%s maze, got %s' % (height * width, height, width, len(wallBytes)))
+			self.wallBytes = bytearray(wallBytes)
+		else:
+			self.wallBytes = bytearray(height * width)		# every wall starts out as 'wall', which packs to 0
+			self.setEdgesToPermanentWalls()
+		self.startCell = self.cells[0][0]
+		self.finishCell = self.cells[self.height - 1][self.width - 1]
+
+	@classmethod
+	def fromMaze(cls, maze):
+		"""returns a CompactMaze with the same walls, start and finish as 'maze'"""
+		compact = cls(maze.height, maze.width, maze.packedWalls())
+		compact.startCell = compact.cells[maze.startCell.row][maze.startCell.col]
+		compact.finishCell = compact.cells[maze.finishCell.row][maze.finishCell.col]
+		return compact
+
+	def toMaze(self):
+		"""returns a Maze, with a Cell object for each position, with the same walls, start and finish - for code that goes through Cells a lot, which is quicker on real ones"""
+		maze = Maze(self.height, self.width)
+		for cell, packed in itertools.izip(maze.iterCells(), self.wallBytes):
+			cell.walls = unpackedWalls[packed][:]
+		maze.startCell = maze.cells[self.startCell.row][self.startCell.col]
+		maze.finishCell = maze.cells[self.finishCell.row][self.finishCell.col]
+		maze.wallsChanged()
+		return maze
+
+	neighbourOrdinal = calculateNeighbourOrdinal
+
+	def ordinalToCell(self, ordinal):
+		row, col = divmod(ordinal, self.width)
+		return CompactCell(row, col, self)
+
+	def packedWalls(self):
+		"""returns the maze's own buffer, not a copy"""
+		return self.wallBytes
+
+	def packedRegionWalls(self, top=0, left=0, height=None, width=None):
+		"""Same as Maze.packedRegionWalls, but sliced from the buffer a row at a time - and always a copy."""
+		bottom, right = self.regionBounds(top, left, height, width)
+		if left == 0 and right == self.width:
+			return self.wallBytes[top * self.width:bottom * self.width]
+		return bytearray().join([self.wallBytes[row * self.width + left:row * self.width + right] for row in xrange(top, bottom)])
+
+	def blockedFlags(self, direction, top=0, left=0, height=None, width=None):
+		"""Same as Maze.blockedFlags, but translated from the packed walls in one go, without looking at any cells."""
+		return self.packedRegionWalls(top, left, height, width).translate(packedBlocked[direction])
+
+	def wallsForOrdinal(self, ordinal):
+		"""returns what a CompactCell uses as its walls"""
+		return CompactWalls(self.wallBytes, ordinal)
+
+	def iterAsciiLines(self):
+		"""Same as Maze.iterAsciiLines, but each row is translated straight from the packed wall bytes."""
+		yield ' ' + '_'*((self.width * 2) - 1) + ' \n'
+		for start in xrange(0, self.height * self.width, self.width):
+			yield asciiLineForPackedRow(self.wallBytes[start:start + self.width])
+
+class CompactRows(object):
+	"""Stands in for the list of rows in Maze.cells, so that cells[row][col] works. Any maze that has a wallsForOrdinal method can use these."""
+	def __init__(self, maze):
+		self.maze = maze
+
+	def __len__(self):
+		return self.maze.height
+
+	def __getitem__(self, row):
+		if row < 0: row += self.maze.height
+		if (row < 0) or (row >= self.maze.height):
+			raise IndexError('row %s is outside the maze' % row)
+		return CompactRow(self.maze, row)
+
+	def __iter__(self):
+		for row in xrange(self.maze.height):
+			yield CompactRow(self.maze, row)
+
+class CompactRow(object):
+	def __init__(self, maze, row):
+		self.maze = maze
+		self.row = row
+
+	def __len__(self):
+		return self.maze.width
+
+	def __getitem__(self, col):
+		if col < 0: col += self.maze.width
+		if (col < 0) or (col >= self.maze.width):
+			raise IndexError('column %s is outside the maze' % col)
+		return CompactCell(self.row, col, self.maze)
+
+	def __iter__(self):
+		for col in xrange(self.maze.width):
+			yield CompactCell(self.row, col, self.maze)
+
+class CompactWalls(object):
+	"""Stands in for Cell.walls, reading and writing one cell's byte in a CompactMaze."""
+	def __init__(self, wallBytes, ordinal):
+		self.wallBytes = wallBytes
+		self.ordinal = ordinal
+
+	def __len__(self):
+		return 4
+
+	def __getitem__(self, direction):
+		return unpackWall(self.wallBytes[self.ordinal], direction)
+
+	def __setitem__(self, direction, value):
+		shift = 2 * direction
+		self.wallBytes[self.ordinal] = (self.wallBytes[self.ordinal] & ~(3 << shift) & 0xff) | (value << shift)
+
+	def __iter__(self):
+		packed = self.wallBytes[self.ordinal]
+		return iter([packed & 3, (packed >> 2) & 3, (packed >> 4) & 3, (packed >> 6) & 3])
+
+	def __repr__(self):
+		return repr(list(self))
+
+class CompactCell(Cell):
+	"""A Cell that's a view onto one byte of a CompactMaze. A new one is created each time a cell is looked up, so they compare equal by position rather than by identity."""
+	def __init__(self, row, col, maze):
+		self.row = row
+		self.col = col
+		self.maze = maze
+		self.walls = maze.wallsForOrdinal(maze.cellPositionToOrdinal(row, col))
+
+	def __eq__(self, other):
+		return isinstance(other, Cell) and (self.maze is other.maze) and (self.row == other.row) and (self.col == other.col)
+
+	def __ne__(self, other):
+		return not self.__eq__(other)
+
+	def __hash__(self):
+		return hash((id(self.maze), self.row, self.col))
+
 
 # Uses a variant of the hunt-and-kill algorith, per http://www.aarg.net/~minam/dungeon_design.html:
 # 1. Start with a rectangular grid, x units wide and y units tall. Mark each cell in the grid 
@@ -173,68 +436,125 @@ class Cell(object):
 # 5. Repeat steps 3 and 4 until all cells in the grid have been visited.
 #
 class HuntAndKillGenerator(object):
-	def __init__(self, maze):
+	def __init__(self, maze, stepHook=None, rng=None):
 		self.maze = maze
-		self.unvisited = range(self.maze.width * self.maze.height)
+		self.rng = makeRng(rng)
+		self.stepHook = stepHook		# if set, called with the generator after each step - see pauseAfterEachStep
+		self.unvisited = list(self.maze.iterOrdinals())
 		self.visited = []
+		# bookkeeping so every step is O(1) and generation stays linear in the number of cells:
+		# a visited map for membership tests, the index of each ordinal in self.unvisited (so we
+		# can swap-remove instead of list.remove), and the visited cells we might restart from
+		self.visitedMap = bytearray(len(self.unvisited))
+		self.unvisitedIndex = array('l', self.unvisited)
+		self.restartCandidates = []
 				
 	def generate(self):		
-		currentCellOrdinal = random.choice(self.unvisited)
+		debugging = logging.getLogger().isEnabledFor(logging.DEBUG)	# checked once, so a step costs nothing extra unless we're debugging
+		currentCellOrdinal = self.rng.choice(self.unvisited)
 		self.moveCellFromUnvisitedToVisited(currentCellOrdinal)
 		currentCell = self.maze.ordinalToCell(currentCellOrdinal)
 		
 		while len(self.unvisited) > 0:
-			logging.debug('Processing cell [%s][%s] with ordinal %s.' % (currentCell.row, currentCell.col, currentCell.ordinal()))
-			logging.debug('Visited: %s, Unvisited: %s' % (self.visited, self.unvisited))
+			if debugging:
+				logging.debug('Processing cell [%s][%s] with ordinal %s.', currentCell.row, currentCell.col, currentCell.ordinal())
+				logging.debug('Visited: %s, Unvisited: %s', self.visited, self.unvisited)
 			validAdjacentCell = None
 			while validAdjacentCell == None:
 				validAdjacentCell = self.getRandomValidAdjacentCell(currentCell)
 				
-				logging.debug('\n%s' % self.maze)
-				if logging.getLogger().getEffectiveLevel() <= logging.DEBUG: raw_input('Press return to continue ')
-				logging.debug('\n%s' % ('-'*40))
+				if debugging: logging.debug('\n%s', self.maze)
+				if self.stepHook != None: self.stepHook(self)
 				
 				if validAdjacentCell == None: 	# we're stopped here, so pick another visited cell to start again
-					currentCell = self.getRandomVisitedCell()
-					logging.debug('No valid adjacent cells... choosing a different visited cell to try next: %s.' % (currentCell.ordinal()))
+					currentCell = self.getRandomRestartCell()
+					if debugging: logging.debug('No valid adjacent cells... choosing a different visited cell to try next: %s.', currentCell.ordinal())
 
 			currentCell.openPassageToCell(validAdjacentCell)
 			
 			self.moveCellFromUnvisitedToVisited(validAdjacentCell.ordinal())
 			currentCell = validAdjacentCell
 		
-		logging.info('Finished.\n%s' % (self.maze))
+		logging.info('Finished.\n%s', self.maze)
 
 
 	def moveCellFromUnvisitedToVisited(self, cellOrdinal):
-		self.unvisited.remove(cellOrdinal)
+		if self.visitedMap[cellOrdinal]:
+			raise ValueError('cell %s has already been visited' % cellOrdinal)
+		# swap the last unvisited ordinal into this one's slot, so removal doesn't shift the list
+		index = self.unvisitedIndex[cellOrdinal]
+		lastOrdinal = self.unvisited.pop()
+		if lastOrdinal != cellOrdinal:
+			self.unvisited[index] = lastOrdinal
+			self.unvisitedIndex[lastOrdinal] = index
+		self.visitedMap[cellOrdinal] = 1
 		self.visited.append(cellOrdinal)
+		self.restartCandidates.append(cellOrdinal)
 	
 	def getAllUnvisitedAdjacentCellOrdinals(self, startCell):
 		"""returns a list of ordinals for each adjacent cell that's not been visited, or [] if all adjacent cells have been visited."""
-		allAdjacentCells = startCell.getAllAdjacentCells()
-		return [cell.ordinal() for cell in allAdjacentCells if cell.ordinal() in self.unvisited]
+		visitedMap = self.visitedMap
+		neighbourOrdinal = self.maze.neighbourOrdinal
+		startOrdinal = startCell.ordinal()
+		adjacentOrdinals = [neighbourOrdinal(startOrdinal, direction) for direction in directions]
+		return [ordinal for ordinal in adjacentOrdinals if ordinal != noNeighbour and not visitedMap[ordinal]]
 
 	def getRandomValidAdjacentCell(self, currentCell):
 		possibleValidAdjacentCellOrdinals = self.getAllUnvisitedAdjacentCellOrdinals(currentCell)
-		logging.debug('Valid adjacent cell ordinals are: %s' % (possibleValidAdjacentCellOrdinals))
+		logging.debug('Valid adjacent cell ordinals are: %s', possibleValidAdjacentCellOrdinals)
 		
 		if possibleValidAdjacentCellOrdinals != []:
-			return self.maze.ordinalToCell(random.choice(possibleValidAdjacentCellOrdinals))
+			return self.maze.ordinalToCell(self.rng.choice(possibleValidAdjacentCellOrdinals))
 		else:
 			return None
 			
 	def getRandomVisitedCell(self):
 		if self.visited != []:
-			return self.maze.ordinalToCell(random.choice(self.visited))
+			return self.maze.ordinalToCell(self.rng.choice(self.visited))
 		else:
 			return None
 			
+	def getRandomRestartCell(self):
+		"""Returns a random visited cell that still has an unvisited neighbour, or None if there isn't one. This picks with the same odds as retrying getRandomVisitedCell until it finds such a cell, but a visited cell that's found to be surrounded can never be a restart point again, so it's dropped from the candidates - each cell is dropped at most once, so restarts are O(1) amortized instead of wandering over an ever-growing list of dead cells."""
+		candidates = self.restartCandidates
+		while candidates:
+			index = self.rng.randrange(len(candidates))
+			cell = self.maze.ordinalToCell(candidates[index])
+			if self.getAllUnvisitedAdjacentCellOrdinals(cell) != []:
+				return cell
+			candidates[index] = candidates[-1]
+			candidates.pop()
+		return None
+
+def makeRng(rng=None):
+	"""Returns the random number generator a generator should use: 'rng' can be a random.Random (or anything with the same methods, like FastRandom), which is used as is, or a seed for a new random.Random. With None you get the global random module, so results depend on its shared state - pass a seed when the same maze has to come out every time."""
+	if rng == None:
+		return random
+	elif isinstance(rng, (int, long)):
+		return random.Random(rng)
+	else:
+		return rng
+
+class FastRandom(random.Random):
+	"""A random.Random for bulk generation: randrange and randint skip argument checking and use a single random() call, which is several times quicker in tight loops. The odds are only off by float rounding, which doesn't matter for ranges the size of a maze. Seeded the same way, it always gives the same mazes - but not the same ones as random.Random."""
+	def randrange(self, start, stop=None):
+		if stop == None:
+			return int(self.random() * start)
+		return start + int(self.random() * (stop - start))
+
+	def randint(self, a, b):
+		return a + int(self.random() * (b - a + 1))
+
+def pauseAfterEachStep(generator):
+	"""A stepHook for the generators: shows the maze so far and waits for return to be pressed, so you can watch the algorithm work."""
+	print(generator.maze)
+	raw_input('Press return to continue ')
+	print('-'*40)
 			
 			
 if __name__ == '__main__':
 	height = int(raw_input('Enter height of maze: '))
 	width = int(raw_input('Enter width of maze: '))
 	m = Maze(height, width)
-	g = HuntAndKillGenerator(m)
+	g = HuntAndKillGenerator(m, stepHook=pauseAfterEachStep)
 	g.generate()
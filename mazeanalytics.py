@@ -0,0 +1,67 @@
+
+from array import array
+from maze import *
+from mazesolver import passableWalls, passageSteps, passageCounts, endsOf
+
+# Numbers for tuning levels: how far every cell is from the start, how long the solution is, how
+# many dead ends and junctions there are, and the longest path anywhere in the maze. Like the
+# solvers, everything works on ordinals and the maze's packed walls, with the results kept in
+# flat arrays, and it all comes from two breadth-first searches plus a translate of the walls.
+#
+# The longest path is found by searching again from the cell furthest from the start - in a
+# perfect maze (a tree), the cell furthest from any cell is one end of a longest path, so the
+# cell furthest from that is the other end. In a maze with loops it's only a lower bound.
+
+class MazeStats(object):
+	def __init__(self, distances, solutionLength, openingCounts, diameter, diameterEnds):
+		self.distances = distances			# an array('i') of how many moves each cell is from the start, by ordinal, or -1 if it can't be reached
+		self.solutionLength = solutionLength		# the moves from the start to the finish, or None if there's no way through
+		self.openingCounts = openingCounts		# how many cells have 0, 1, 2, 3 and 4 openings
+		self.diameter = diameter			# the moves along the longest path between two reachable cells
+		self.diameterEnds = diameterEnds		# the ordinals of the cells at either end of it
+
+	def deadEnds(self):
+		"""the number of cells with only one way in or out"""
+		return self.openingCounts[1]
+
+	def junctions(self):
+		"""the number of cells with three or four openings, where there's a choice to make"""
+		return self.openingCounts[3] + self.openingCounts[4]
+
+	def branchingFactor(self):
+		"""the average number of ways on from a junction, not counting the way in, or 0 if there are no junctions"""
+		if not self.junctions():
+			return 0.0
+		return float(2 * self.openingCounts[3] + 3 * self.openingCounts[4]) / self.junctions()
+
+	def __repr__(self):
+		return '<MazeStats: solution %s, %s dead ends, %s junctions, diameter %s>' % (self.solutionLength, self.deadEnds(), self.junctions(), self.diameter)
+
+def mazeStats(maze, start=None, finish=None):
+	"""Returns a MazeStats for the maze, with distances measured from 'start' to 'finish' (ordinals, defaulting to the maze's startCell and finishCell)."""
+	start, finish = endsOf(maze, start, finish)
+	walls = passableWalls(maze)
+	steps = passageSteps(maze.width)
+	distances, furthest = distancesFrom(walls, steps, start)
+	solutionLength = distances[finish]
+	if solutionLength < 0:
+		solutionLength = None
+	openings = walls.translate(passageCounts)
+	openingCounts = [openings.count(chr(count)) for count in range(5)]
+	fromFurthest, otherEnd = distancesFrom(walls, steps, furthest)
+	return MazeStats(distances, solutionLength, openingCounts, fromFurthest[otherEnd], (furthest, otherEnd))
+
+def distancesFrom(walls, steps, start):
+	"""Searches outwards from 'start' over packed walls from passableWalls, and returns an array('i') of how many moves each cell is from it (-1 where it can't be reached) and the ordinal of a cell as far away as any."""
+	distances = array('i', [-1]) * len(walls)
+	distances[start] = 0
+	queue = array('l', [start])
+	enqueue = queue.append
+	for ordinal in queue:		# as in solveBFS, iterating the array picks up what's appended along the way
+		distance = distances[ordinal] + 1
+		for step in steps[walls[ordinal]]:
+			neighbour = ordinal + step
+			if distances[neighbour] < 0:
+				distances[neighbour] = distance
+				enqueue(neighbour)
+	return distances, queue[-1]
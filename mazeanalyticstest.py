@@ -0,0 +1,73 @@
+
+import unittest
+from mazeanalytics import *
+from mazegenerators import generators
+from mazetest import getFinishedTestMaze
+
+
+class MazeAnalyticsTest(unittest.TestCase):
+	def testSmallMaze(self):
+		# maze looks like this (the same one as in mazetest):
+		#  _______
+		# |__ ___ |
+		# |__ __| |
+		# |___|___|
+		stats = mazeStats(getFinishedTestMaze())
+		self.assertEqual([0, 1, 2, 3, 3, 2, 3, 4, 4, 3, 6, 5], list(stats.distances))
+		self.assertEqual(5, stats.solutionLength)
+		self.assertEqual([0, 5, 5, 1, 1], stats.openingCounts)
+		self.assertEqual(5, stats.deadEnds())
+		self.assertEqual(2, stats.junctions())
+		self.assertEqual(2.5, stats.branchingFactor())
+		self.assertEqual(8, stats.diameter)
+		self.assertEqual(set([10, 8]), set(stats.diameterEnds))
+
+	def testOtherEnds(self):
+		stats = mazeStats(getFinishedTestMaze(), start=10, finish=4)
+		self.assertEqual(7, stats.solutionLength)
+		self.assertEqual(0, stats.distances[10])
+		self.assertEqual(8, stats.diameter)
+
+	def testNoWayThrough(self):
+		m = Maze(2,2)
+		m.cells[0][0].openPassageInDirection(east)
+		stats = mazeStats(m)
+		self.assertEqual(None, stats.solutionLength)
+		self.assertEqual([0, 1, -1, -1], list(stats.distances))
+		self.assertEqual(1, stats.diameter)
+		self.assertEqual([2, 2, 0, 0, 0], stats.openingCounts)
+		self.assertEqual(0.0, stats.branchingFactor())
+
+	def testOneCell(self):
+		stats = mazeStats(Maze(1,1))
+		self.assertEqual(0, stats.solutionLength)
+		self.assertEqual(0, stats.diameter)
+		self.assertEqual([1, 0, 0, 0, 0], stats.openingCounts)
+
+	def testMatchesAskingTheCells(self):
+		for name, generatorClass in sorted(generators.items()):
+			m = CompactMaze(7,9)
+			generatorClass(m, rng=3).generate()
+			stats = mazeStats(m)
+			self.assertEqual(cellDistances(m, m.startCell), list(stats.distances), name)
+			self.assertEqual(len([cell for cell in m.iterCells() if len(cell.getAllAdjacentUnblockedCells()) == 1]), stats.deadEnds(), name)
+			self.assertEqual(max([max(cellDistances(m, cell)) for cell in m.iterCells()]), stats.diameter, name)
+			self.assertEqual(stats.diameter, cellDistances(m, m.ordinalToCell(stats.diameterEnds[0]))[stats.diameterEnds[1]])
+
+
+def cellDistances(maze, startCell):
+	"""the distance of each cell from 'startCell', the slow way"""
+	distances = [-1] * (maze.height * maze.width)
+	distances[startCell.ordinal()] = 0
+	frontier = [startCell]
+	while frontier:
+		cell = frontier.pop(0)
+		for neighbour in cell.getAllAdjacentUnblockedCells():
+			if distances[neighbour.ordinal()] < 0:
+				distances[neighbour.ordinal()] = distances[cell.ordinal()] + 1
+				frontier.append(neighbour)
+	return distances
+
+
+if __name__ == '__main__':
+	unittest.main()
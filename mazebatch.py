@@ -0,0 +1,102 @@
+
+import sys
+import random
+import multiprocessing
+from maze import *
+from mazegenerators import RowGenerator
+from mazevalidate import findProblems
+
+# Generates lots of mazes at once across a pool of worker processes. Each maze is generated from
+# its own seeded random.Random, so a maze comes out the same no matter which worker builds it,
+# and workers send back just the packed wall bytes (a byte per cell - see CompactMaze) rather
+# than pickling a Maze's whole Cell object graph.
+
+def emptyMazeFor(generatorClass, height, width):
+	"""returns a new maze of whichever kind 'generatorClass' generates quickest"""
+	if issubclass(generatorClass, RowGenerator):
+		return CompactMaze(height, width)		# row generators write straight into the packed bytes
+	return Maze(height, width)				# cell-at-a-time generators are quicker on real Cells
+
+def generatePackedWalls(task):
+	"""Worker: generates one maze for a (height, width, seed, generatorClass) task and returns its packed walls as a string."""
+	height, width, seed, generatorClass = task
+	maze = emptyMazeFor(generatorClass, height, width)
+	generatorClass(maze, rng=random.Random(seed)).generate()
+	return str(maze.packedWalls())
+
+def generateAndValidatePackedWalls(task):
+	"""Worker: like generatePackedWalls, but returns (packed walls, problems) where problems is what mazevalidate.findProblems finds wrong with the maze"""
+	height, width = task[:2]
+	wallBytes = generatePackedWalls(task)
+	return wallBytes, findProblems(CompactMaze(height, width, wallBytes))
+
+def iterMazes(dimensions, seeds=None, generatorClass=HuntAndKillGenerator, processes=None, chunksize=1, validate=False):
+	"""Yields a CompactMaze for each (height, width) in 'dimensions', in order, generated across 'processes' worker processes (by default one per CPU). 'seeds' gives each maze's seed; by default maze i uses seed i. With 'validate', the workers also check each maze is a perfect maze, and a ValueError is raised for the first that isn't."""
+	dimensions = list(dimensions)
+	if seeds == None:
+		seeds = range(len(dimensions))
+	if len(seeds) != len(dimensions):
+		raise ValueError('need one seed per maze, got %s seeds for %s mazes' % (len(seeds), len(dimensions)))
+	tasks = [(height, width, seed, generatorClass) for (height, width), seed in zip(dimensions, seeds)]
+	pool = multiprocessing.Pool(processes)
+	try:
+		if not validate:
+			for (height, width), wallBytes in zip(dimensions, pool.imap(generatePackedWalls, tasks, chunksize)):
+				yield CompactMaze(height, width, wallBytes)
+			return
+		for task, (wallBytes, problems) in zip(tasks, pool.imap(generateAndValidatePackedWalls, tasks, chunksize)):
+			if problems:
+				raise ValueError('the %sx%s maze with seed %s is not a perfect maze: %s' % (task[0], task[1], task[2], '; '.join(problems)))
+			yield CompactMaze(task[0], task[1], wallBytes)
+	finally:
+		pool.terminate()
+		pool.join()
+
+def generateMazes(dimensions, seeds=None, generatorClass=HuntAndKillGenerator, processes=None, chunksize=1, validate=False):
+	"""returns a list of CompactMazes - see iterMazes"""
+	return list(iterMazes(dimensions, seeds, generatorClass, processes, chunksize, validate))
+
+
+class MazePrefetcher(object):
+	"""Generates the next maze in a worker process while the current one's being played. start asks for a maze, and take hands it over as a CompactMaze - the prefetched one if it's ready, or else one generated there and then from the same seed, so you get the same maze either way."""
+	def __init__(self, generatorClass=HuntAndKillGenerator, rng=None):
+		self.generatorClass = generatorClass
+		self.rng = makeRng(rng)		# picks each maze's seed
+		self.pool = None
+		self.pending = None			# (task, async result) for the maze being prefetched
+
+	def start(self, height, width):
+		"""starts generating a 'height' by 'width' maze in the background, in place of any that's already pending"""
+		if self.pending != None and not self.ready():
+			self.close()		# the worker's still busy with a maze nobody wants any more
+		task = (height, width, self.newSeed(), self.generatorClass)
+		if self.pool == None:
+			self.pool = multiprocessing.Pool(1)
+		self.pending = (task, self.pool.apply_async(generatePackedWalls, [task]))
+
+	def ready(self):
+		"""returns True if there's a prefetched maze waiting to be taken"""
+		return self.pending != None and self.pending[1].ready()
+
+	def take(self, height, width):
+		"""Returns a 'height' by 'width' CompactMaze. If that's the size that was started and the worker's finished, that maze is used; otherwise it's generated here, without waiting."""
+		if self.pending != None and self.pending[0][:2] == (height, width):
+			task, result = self.pending
+			if result.ready():
+				self.pending = None
+				return CompactMaze(height, width, result.get())
+			self.close()			# stop the worker competing with us for the CPU
+		else:
+			task = (height, width, self.newSeed(), self.generatorClass)
+		return CompactMaze(height, width, generatePackedWalls(task))
+
+	def newSeed(self):
+		return self.rng.randrange(sys.maxint)
+
+	def close(self):
+		"""stops the worker and forgets any maze that was pending"""
+		if self.pool != None:
+			self.pool.terminate()
+			self.pool.join()
+		self.pool = None
+		self.pending = None
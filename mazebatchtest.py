@@ -0,0 +1,93 @@
+
+import time
+import unittest
+from mazebatch import *
+from mazegenerators import EllersGenerator
+
+
+class MazeBatchTest(unittest.TestCase):
+	def testGeneratesEachMazeWithItsDimensions(self):
+		dimensions = [(3,4), (4,5), (5,6)]
+		mazes = generateMazes(dimensions, processes=2)
+		self.assertEqual(dimensions, [(m.height, m.width) for m in mazes])
+		for m in mazes:
+			passages = sum([len(cell.getAllAdjacentUnblockedCells()) for row in m.cells for cell in row]) / 2
+			self.assertEqual(m.height * m.width - 1, passages)
+
+	def testMazesDependOnlyOnTheirSeeds(self):
+		dimensions = [(6,8)] * 6
+		seeds = [10, 11, 12, 13, 14, 15]
+		onOneProcess = generateMazes(dimensions, seeds, processes=1)
+		onThreeProcesses = generateMazes(dimensions, seeds, processes=3)
+		self.assertEqual([str(m) for m in onOneProcess], [str(m) for m in onThreeProcesses])
+		inWorker = generatePackedWalls((6, 8, 12, HuntAndKillGenerator))
+		self.assertEqual(inWorker, str(onOneProcess[2].wallBytes))
+		self.assertNotEqual(str(onOneProcess[0]), str(onOneProcess[1]))
+
+	def testRowGenerators(self):
+		mazes = generateMazes([(5,5), (6,6)], [1, 2], generatorClass=EllersGenerator, processes=2)
+		self.assertEqual(generatePackedWalls((6, 6, 2, EllersGenerator)), str(mazes[1].wallBytes))
+
+	def testValidating(self):
+		mazes = generateMazes([(4,5), (5,6)], [1, 2], processes=2, validate=True)
+		self.assertEqual([str(m) for m in generateMazes([(4,5), (5,6)], [1, 2], processes=1)], [str(m) for m in mazes])
+		self.assertEqual([], generateAndValidatePackedWalls((4, 5, 1, HuntAndKillGenerator))[1])
+		self.assertRaises(ValueError, generateMazes, [(4,5), (5,6)], [1, 2], LoopyGenerator, processes=2, validate=True)
+		self.assertEqual(2, len(generateMazes([(4,5), (5,6)], [1, 2], LoopyGenerator, processes=2)))
+
+	def testNeedsOneSeedPerMaze(self):
+		self.assertRaises(ValueError, generateMazes, [(3,3), (3,3)], [1])
+
+
+class LoopyGenerator(HuntAndKillGenerator):
+	"""makes a maze with a loop in it"""
+	def generate(self):
+		HuntAndKillGenerator.generate(self)
+		for cell in [self.maze.cells[0][0], self.maze.cells[0][1], self.maze.cells[1][0]]:
+			cell.openPassageInDirection(east)
+			cell.openPassageInDirection(south)
+
+
+class MazePrefetcherTest(unittest.TestCase):
+	def setUp(self):
+		self.prefetcher = MazePrefetcher(rng=5)
+
+	def tearDown(self):
+		self.prefetcher.close()
+
+	def testPrefetchedMazeIsTheSameAsOneGeneratedOnTheSpot(self):
+		self.prefetcher.start(6,8)
+		waitUntilReady(self.prefetcher)
+		prefetched = self.prefetcher.take(6,8)
+		notPrefetched = MazePrefetcher(rng=5).take(6,8)		# picks the same seed, but has to generate it there and then
+		self.assertEqual((6,8), (prefetched.height, prefetched.width))
+		self.assertEqual(str(notPrefetched), str(prefetched))
+		self.assertEqual(False, self.prefetcher.ready())
+
+	def testTakingBeforeItsReadyGivesTheSameMaze(self):
+		self.prefetcher.start(60,80)
+		taken = self.prefetcher.take(60,80)
+		self.assertEqual(str(MazePrefetcher(rng=5).take(60,80)), str(taken))
+
+	def testTakingADifferentSizeGeneratesIt(self):
+		self.prefetcher.start(6,8)
+		m = self.prefetcher.take(3,4)
+		self.assertEqual((3,4), (m.height, m.width))
+		passages = sum([len(cell.getAllAdjacentUnblockedCells()) for cell in m.iterCells()]) / 2
+		self.assertEqual(11, passages)
+
+	def testEachLevelGetsANewMaze(self):
+		self.prefetcher.start(6,8)
+		first = self.prefetcher.take(6,8)
+		self.prefetcher.start(6,8)
+		self.assertNotEqual(str(first), str(self.prefetcher.take(6,8)))
+
+
+def waitUntilReady(prefetcher, timeout=10):
+	start = time.time()
+	while not prefetcher.ready() and time.time() - start < timeout:
+		time.sleep(0.01)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,575 @@
+
+# Rough performance benchmarks - run 'python mazebench.py' to print timings for each benchmark,
+# or 'python mazebench.py <name> [sizes...]' to run just one, e.g. 'python mazebench.py huntandkill 1000 10000'.
+# Sizes are cell counts; mazes are made as close to square as possible.
+#
+# 'python mazebench.py --json ...' prints each measurement as a line of JSON instead, to keep, and
+# 'python mazebench.py --compare old.json new.json [tolerance]' lists what got slower or bigger
+# between two such runs by more than the tolerance (0.25, or 25%, by default), exiting with 1 if
+# anything did - e.g. save 'python mazebench.py --json scaling > 1.2.json' for each release.
+
+import sys
+import gc
+import json
+import time
+import logging
+import multiprocessing
+import resource
+import os
+import random
+import tempfile
+import threading
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')		# keeps pygame's greeting out of the results
+from maze import *
+from mazegenerators import *
+from mazebatch import generateMazes, MazePrefetcher
+import mazeio
+import mazesolver
+import mazestream
+import mazetiles
+import mazevalidate
+import mazeanalytics
+import mazedifficulty
+import mazecache
+from mazegraph import CorridorGraph
+
+
+def dimensionsForCellCount(cellCount):
+	"""returns a (height, width) pair for a roughly square maze with about 'cellCount' cells"""
+	height = max(1, int(cellCount ** 0.5))
+	width = max(1, cellCount // height)
+	return (height, width)
+
+def timeCall(function, *args):
+	"""returns the number of seconds it takes to call 'function' with 'args'"""
+	start = time.time()
+	function(*args)
+	return time.time() - start
+
+def currentRss():
+	"""returns the resident set size of this process in bytes (Linux only - it reads /proc)"""
+	pages = int(open('/proc/self/statm').read().split()[1])
+	return pages * resource.getpagesize()
+
+def peakRss():
+	"""returns the most this process's resident set size has been since it started or resetPeakRss was last called, in bytes (Linux only)"""
+	for line in open('/proc/self/status'):
+		if line.startswith('VmHWM:'):
+			return int(line.split()[1]) * 1024
+
+def resetPeakRss():
+	"""starts peakRss again from the current resident set size - otherwise a child process starts with its parent's peak"""
+	open('/proc/self/clear_refs', 'w').write('5')
+
+def measureInChildProcess(function, *args, **options):
+	"""Calls 'function' with 'args' in a fresh process and returns (seconds, bytes), where bytes is how much the process grew while keeping the result alive - running in a child stops memory freed by earlier measurements from being reused and hiding the cost. With peak=True, bytes is how far the process grew at its largest instead, which counts memory used along the way and then freed.
+	With setup=f, f(*args) is called in the child first, untimed, and 'function' is called with what it returns instead of 'args'. With objects=True, it returns (seconds, bytes, objects), where objects is how many more objects the garbage collector tracks (cells, lists, dicts and so on) after the call than before - the collector is paused during the call so none are collected along the way, which leaves its time out of the seconds too."""
+	def measure(results):
+		callArgs = args
+		if options.get('setup'):
+			callArgs = options['setup'](*args)
+		if options.get('objects'):
+			gc.collect()
+			gc.disable()
+			objectsBefore = gc.get_count()[0]
+		resetPeakRss()
+		before = currentRss()
+		start = time.time()
+		result = function(*callArgs)
+		seconds = time.time() - start
+		if options.get('peak'):
+			measured = (seconds, peakRss() - before)
+		else:
+			measured = (seconds, currentRss() - before)
+		if options.get('objects'):
+			measured += (gc.get_count()[0] - objectsBefore,)
+			gc.enable()
+		results.put(measured)
+	results = multiprocessing.Queue()
+	process = multiprocessing.Process(target=measure, args=(results,))
+	process.start()
+	measured = results.get()
+	process.join()
+	return measured
+
+jsonOutput = False		# set by --json
+currentBenchmark = None		# the name of the benchmark running, for the JSON output
+
+def show(text, **fields):
+	"""Prints a line of results: 'text', or with --json, 'fields' and the name of the benchmark as a JSON object. A 'seconds' or 'bytes' field is what --compare compares, so it should mean the same thing from run to run."""
+	if jsonOutput:
+		fields['benchmark'] = currentBenchmark
+		print(json.dumps(fields, sort_keys=True))
+	else:
+		print(text)
+
+def report(name, cellCount, seconds, bytes=None, objects=None):
+	perCell = (seconds * 1e6) / cellCount
+	line = '%-24s %12d cells %10.3f sec %10.3f usec/cell %12.0f cells/sec' % (name, cellCount, seconds, perCell, cellCount / max(seconds, 1e-9))
+	fields = {'name': name, 'cells': cellCount, 'seconds': seconds}
+	if bytes != None:
+		line += ' %12.1f MB %8.1f bytes/cell' % (bytes / 1e6, float(bytes) / cellCount)
+		fields['bytes'] = bytes
+	if objects != None:
+		line += ' %12d objects' % objects
+		fields['objects'] = objects
+	show(line, **fields)
+
+
+def benchmarkHuntAndKill(sizes):
+	"""Generation time should grow linearly with the number of cells, so usec/cell should stay roughly flat from size to size."""
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		generator = HuntAndKillGenerator(Maze(height, width))
+		report('huntandkill', height * width, timeCall(generator.generate))
+
+
+def benchmarkLogging(sizes):
+	"""Compares generation at INFO (where the per-step debug output is off) with logging switched off entirely - the two should be within noise of each other."""
+	logger = logging.getLogger()
+	oldLevel, oldHandlers = logger.level, logger.handlers
+	logger.handlers = [logging.NullHandler()]		# so the finished maze isn't printed
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		logger.setLevel(logging.INFO)
+		report('generate at INFO', height * width, timeCall(HuntAndKillGenerator(Maze(height, width)).generate))
+		logging.disable(logging.CRITICAL)
+		report('generate, no logging', height * width, timeCall(HuntAndKillGenerator(Maze(height, width)).generate))
+		logging.disable(logging.NOTSET)
+	logger.setLevel(oldLevel)
+	logger.handlers = oldHandlers
+
+def benchmarkRowGenerators(sizes):
+	"""Compares cells/sec for the row-at-a-time generators on a CompactMaze against hunt-and-kill on a Maze. Hunt-and-kill is skipped past 10^6 cells, and sidewinder and Eller's past 10^7, since they'd take minutes."""
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		if cellCount <= 10**6:
+			report('huntandkill', height * width, timeCall(HuntAndKillGenerator(Maze(height, width)).generate))
+		report('binarytree', height * width, timeCall(BinaryTreeGenerator(CompactMaze(height, width)).generate))
+		if cellCount <= 10**7:
+			report('sidewinder', height * width, timeCall(SidewinderGenerator(CompactMaze(height, width)).generate))
+			report('ellers', height * width, timeCall(EllersGenerator(CompactMaze(height, width)).generate))
+
+def levelDimensions(count):
+	"""returns (height, width) for the first 'count' levels of the game, as MazeUI.getDimensionsOfNextMaze grows them"""
+	from mazeui import MazeUI, MAZE_WIDTH, MAZE_HEIGHT
+	dimensions = []
+	width, height = MAZE_WIDTH, MAZE_HEIGHT
+	for level in range(count):
+		dimensions.append((height, width))
+		width, height = MazeUI(width, height).getDimensionsOfNextMaze()
+	return dimensions
+
+def benchmarkGenerators(sizes):
+	"""Compares every registered generator's speed and peak memory making a CompactMaze (a byte per cell, so the memory is mostly the generator's own bookkeeping), each in a process of its own."""
+	def generate(generatorClass, height, width):
+		generatorClass(CompactMaze(height, width), rng=FastRandom(1)).generate()
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		for name in sorted(generators.keys()):
+			seconds, size = measureInChildProcess(generate, generators[name], height, width, peak=True)
+			report(name, height * width, seconds, size)
+
+def benchmarkTiles(sizes):
+	"""Generates one maze of each size in 256x256 tiles of Eller's with 1, 2, 4... worker processes, up to the number of CPUs, against Eller's on the whole maze in this process, and times checking the tiled maze is perfect."""
+	processCounts = [1]
+	while processCounts[-1] * 2 <= multiprocessing.cpu_count():
+		processCounts.append(processCounts[-1] * 2)
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		report('untiled', height * width, timeCall(EllersGenerator(CompactMaze(height, width), rng=FastRandom(1)).generate))
+		for processes in processCounts:
+			start = time.time()
+			maze = mazetiles.generateTiled(height, width, rng=FastRandom(1), processes=processes)
+			report('tiled, %s processes' % processes, height * width, time.time() - start)
+		start = time.time()
+		if not mazevalidate.isPerfectMaze(maze):
+			raise AssertionError('the tiled maze is not perfect')
+		report('isPerfectMaze', height * width, time.time() - start)
+
+def benchmarkBatch(sizes):
+	"""Generates the first N levels' mazes (N from 'sizes') with 1, 2, 4... worker processes, up to the number of CPUs - time should drop close to linearly with processes."""
+	processCounts = [1]
+	while processCounts[-1] * 2 <= multiprocessing.cpu_count():
+		processCounts.append(processCounts[-1] * 2)
+	for mazeCount in sizes:
+		dimensions = levelDimensions(mazeCount)
+		cellCount = sum([height * width for height, width in dimensions])
+		for processes in processCounts:
+			seconds = timeCall(generateMazes, dimensions, None, HuntAndKillGenerator, processes)
+			report('batch, %s processes' % processes, cellCount, seconds)
+
+def benchmarkPrefetch(sizes):
+	"""Times how long the UI waits for the next level's maze when it's generated on the spot, against taking one a MazePrefetcher has finished in the background."""
+	prefetcher = MazePrefetcher(rng=1)
+	try:
+		for cellCount in sizes:
+			height, width = dimensionsForCellCount(cellCount)
+			report('generated on the spot', height * width, timeCall(prefetcher.take, height, width))
+			prefetcher.start(height, width)
+			while not prefetcher.ready():
+				time.sleep(0.01)
+			report('prefetched', height * width, timeCall(prefetcher.take, height, width))
+	finally:
+		prefetcher.close()
+
+def benchmarkIO(sizes):
+	"""Times saving and loading a maze in the binary format, and opening it memory-mapped and answering a thousand random wall queries - which shouldn't grow with the size of the maze."""
+	handle, path = tempfile.mkstemp(suffix='.maze')
+	os.close(handle)
+	try:
+		for cellCount in sizes:
+			height, width = dimensionsForCellCount(cellCount)
+			maze = CompactMaze(height, width)
+			BinaryTreeGenerator(maze, rng=1).generate()
+			report('save', height * width, timeCall(mazeio.save, maze, path))
+			report('load', height * width, timeCall(mazeio.load, path))
+			def openAndQuery():
+				mapped = mazeio.MappedMaze(path)
+				rng = random.Random(1)
+				for i in range(1000):
+					mapped.cells[rng.randrange(height)][rng.randrange(width)].walls[rng.randrange(4)]
+				mapped.close()
+			seconds = timeCall(openAndQuery)
+			show('%-24s %12d cells %10.6f sec for 1000 queries, %s bytes on disk' % ('mapped', height * width, seconds, os.path.getsize(path)),
+				 name='mapped, 1000 queries', cells=height * width, seconds=seconds, fileBytes=os.path.getsize(path))
+	finally:
+		os.remove(path)
+
+def benchmarkStream(sizes):
+	"""Streams Eller's mazes 1000 cells wide, and as tall as it takes to have each number of cells in 'sizes', to a file and as ASCII art thrown away as it's written - the peak memory shouldn't grow with the height."""
+	width = 1000
+	handle, path = tempfile.mkstemp(suffix='.maze')
+	os.close(handle)
+	try:
+		for cellCount in sizes:
+			height = max(1, cellCount // width)
+			seconds, size = measureInChildProcess(mazestream.streamToFile, height, width, path, mazestream.EllersGenerator, FastRandom(1), peak=True)
+			report('stream to file', height * width, seconds, size)
+			seconds, size = measureInChildProcess(mazestream.streamAscii, height, width, NullStream(), mazestream.EllersGenerator, FastRandom(1), peak=True)
+			report('stream ascii', height * width, seconds, size)
+	finally:
+		os.remove(path)
+
+def benchmarkSolvers(sizes):
+	"""Times each solver from the top left to the bottom right of a maze made by Eller's."""
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		maze = CompactMaze(height, width)
+		EllersGenerator(maze, rng=FastRandom(1)).generate()
+		for solve in [mazesolver.solveBFS, mazesolver.solveBidirectionalBFS, mazesolver.solveAStar]:
+			report(solve.__name__, height * width, timeCall(solve, maze))
+
+def benchmarkValidate(sizes):
+	"""Times finding what's wrong with a maze made by Eller's - nothing, so everything gets looked at - and with one made by hunt-and-kill with an extra passage, as a Maze and as a CompactMaze."""
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		maze = CompactMaze(height, width)
+		EllersGenerator(maze, rng=FastRandom(1)).generate()
+		report('findProblems, perfect', height * width, timeCall(mazevalidate.findProblems, maze))
+		for mazeClass in [Maze, CompactMaze]:
+			if mazeClass is Maze and cellCount > 10**6: continue
+			maze = mazeClass(height, width)
+			HuntAndKillGenerator(maze, rng=FastRandom(1)).generate()
+			maze.cells[height // 2][width // 2].openPassageInDirection(east)
+			maze.cells[height // 2][width // 2].openPassageInDirection(south)
+			report('findProblems, loop, %s' % mazeClass.__name__, height * width, timeCall(mazevalidate.findProblems, maze))
+
+def benchmarkAnalytics(sizes):
+	"""Times mazeStats on a maze made by Eller's - two breadth-first searches and a translate, so it should be linear."""
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		maze = CompactMaze(height, width)
+		EllersGenerator(maze, rng=FastRandom(1)).generate()
+		report('mazeStats', height * width, timeCall(mazeanalytics.mazeStats, maze))
+
+def benchmarkAnalyticsBatch(sizes):
+	"""Times mazeStats over each number of 30x40 mazes in 'sizes', made by Eller's in a batch, as for tuning levels."""
+	for mazeCount in sizes:
+		mazes = generateMazes([(30, 40)] * mazeCount, generatorClass=EllersGenerator)
+		seconds = timeCall(lambda: [mazeanalytics.mazeStats(maze) for maze in mazes])
+		show('%-24s %12d mazes %10.3f sec %10.3f ms/maze' % ('mazeStats, 30x40', mazeCount, seconds, seconds * 1000 / mazeCount),
+			 name='mazeStats, 30x40', mazes=mazeCount, seconds=seconds)
+
+def benchmarkDifficulty(sizes):
+	"""Generates 20 hunt-and-kill mazes of each size to a difficulty - a long solution, then few dead ends - with and without giving up on hopeless candidates part way through, and reports the time and candidates tried per maze accepted."""
+	mazesEach = 20
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		targets = [('long solution', mazedifficulty.Difficulty(solutionLength=(int(2.5 * (height + width)), None))),
+				   ('few dead ends', mazedifficulty.Difficulty(deadEnds=(None, height * width // 10)))]
+		for targetName, difficulty in targets:
+			for rejectEarly in [False, True]:
+				attempts = rejectedEarly = 0
+				start = time.time()
+				for seed in range(mazesEach):
+					targeted = mazedifficulty.generateForDifficulty(height, width, difficulty, rng=seed, processes=1, rejectEarly=rejectEarly)
+					attempts += targeted.attempts
+					rejectedEarly += targeted.rejectedEarly
+				seconds = (time.time() - start) / mazesEach
+				name = '%s%s' % (targetName, rejectEarly and ', early' or '')
+				show('%-24s %12d cells %10.3f sec/maze %8.2f attempts/maze %8.2f given up early/maze' % (name, height * width, seconds, float(attempts) / mazesEach, float(rejectedEarly) / mazesEach),
+					 name=name, cells=height * width, seconds=seconds, attempts=float(attempts) / mazesEach)
+
+def benchmarkCache(sizes):
+	"""Times getting a hunt-and-kill maze from a MazeCache when it has to be generated, when it's in memory and when it's read back from disk, and turning a cached one into a Maze of Cells."""
+	directory = tempfile.mkdtemp()
+	try:
+		for cellCount in sizes:
+			height, width = dimensionsForCellCount(cellCount)
+			cache = mazecache.MazeCache(directory=directory)
+			report('cache miss', height * width, timeCall(cache.get, height, width, 1))
+			report('cache hit', height * width, timeCall(cache.get, height, width, 1))
+			report('cache hit, packed walls', height * width, timeCall(cache.packedWalls, height, width, 1))
+			report('cache hit, Maze', height * width, timeCall(cache.getMaze, height, width, 1))
+			cache.clear()
+			report('cache disk hit', height * width, timeCall(cache.get, height, width, 1))
+	finally:
+		for name in os.listdir(directory):
+			os.remove(os.path.join(directory, name))
+		os.rmdir(directory)
+
+def benchmarkCorridors(sizes):
+	"""Times building the corridor graph of a maze made by Eller's, then solving it junction to junction against solveBFS, and reports how many nodes the graph needed per cell."""
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		maze = CompactMaze(height, width)
+		EllersGenerator(maze, rng=FastRandom(1)).generate()
+		graph = CorridorGraph(maze)
+		report('build corridor graph', height * width, timeCall(graph.refresh))
+		show('%-24s %12d cells %10d nodes %10.3f nodes/cell' % ('corridor graph', height * width, graph.nodeCount(), float(graph.nodeCount()) / (height * width)),
+			 name='corridor graph', cells=height * width, nodes=graph.nodeCount())
+		report('CorridorGraph.solve', height * width, timeCall(graph.solve))
+		report('solveBFS', height * width, timeCall(mazesolver.solveBFS, maze))
+
+def benchmarkFrames(sizes):
+	"""Times a frame of the UI on SDL's dummy video driver: drawing the maze with and without the cached background, and a move pushed to the display whole versus as just the two dirty cell rects."""
+	os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+	import pygame
+	import mazeui
+	pygame.display.init()
+	screen = pygame.display.set_mode((mazeui.SCREEN_WIDTH, mazeui.SCREEN_HEIGHT), 0, 32)
+	frames = 200
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		mui = mazeui.MazeUI(width, height, screen=screen, offsetPixels=True, rng=1)
+		HuntAndKillGenerator(mui.maze, rng=mui.rng).generate()
+		def frameTime(name, drawFrame):
+			seconds = timeCall(lambda: [drawFrame() for i in range(frames)])
+			show('%-24s %12d cells %10.3f ms/frame' % (name, height * width, seconds * 1000 / frames), name=name, cells=height * width, seconds=seconds / frames)
+		def redrawWalls():
+			mui.backgroundDrawnAt = None
+			mui.drawMaze()
+			mui.updateDisplay()
+		wallCount = sum([len([d for d in directions if cell.walls[d] in blocked]) for cell in mui.maze.iterCells()])
+		show('%-24s %12d cells %10d walls %10d lines' % ('merged wall lines', height * width, wallCount, len(mui.wallSegments())),
+			 name='merged wall lines', cells=height * width, walls=wallCount, lines=len(mui.wallSegments()))
+		frameTime('drawMaze, walls', redrawWalls)
+		frameTime('drawMaze, cached', lambda: (mui.drawMaze(), mui.updateDisplay()))
+		cells = [mui.maze.cells[0][0]]
+		def move():
+			cells.append(mui.moveToRandomNewCellAndDraw(cells.pop()))
+		def moveAndUpdateWholeScreen():
+			move()
+			pygame.display.update()
+			mui.dirtyRects = []
+		frameTime('move, whole screen', moveAndUpdateWholeScreen)
+		frameTime('move, dirty rects', lambda: (move(), mui.updateDisplay()))
+	pygame.display.quit()
+
+def benchmarkEventLoop(sizes):
+	"""Runs the game on SDL's dummy video driver for a few seconds at a time while another thread posts arrow keys at each rate in 'sizes' (key presses per second, 0 for none). Reports the CPU time the process used as a share of the time that passed, and how long keys waited to be handled - for MazeGame.run, and for a loop that just keeps polling for events, like main() used to."""
+	os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+	import pygame
+	import mazeui
+	pygame.display.init()
+	screen = pygame.display.set_mode((mazeui.SCREEN_WIDTH, mazeui.SCREEN_HEIGHT), 0, 32)
+	seconds = 3
+	latencies = []
+	class TimedGame(mazeui.MazeGame):
+		def handleEvent(self, event, now=None):
+			if event.type == pygame.KEYDOWN:
+				latencies.append(time.time() - event.posted)
+			mazeui.MazeGame.handleEvent(self, event, now)
+	def pollForever(game):
+		while game.running:
+			for event in pygame.event.get():
+				game.handleEvent(event)
+			game.update()
+	def postKeys(keysPerSecond):
+		rng = random.Random(1)
+		end = time.time() + seconds
+		while time.time() < end:
+			if keysPerSecond:
+				time.sleep(1.0 / keysPerSecond)
+				pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=rng.choice([pygame.K_UP, pygame.K_RIGHT, pygame.K_DOWN, pygame.K_LEFT]), posted=time.time()))
+			else:
+				time.sleep(end - time.time())
+		pygame.event.post(pygame.event.Event(pygame.QUIT))
+	for keysPerSecond in sizes:
+		for name, runGame in [('MazeGame.run', TimedGame.run), ('polling loop', pollForever)]:
+			game = TimedGame(screen, autoMoveDelay=0.02)
+			del latencies[:]
+			poster = threading.Thread(target=postKeys, args=(keysPerSecond,))
+			before, start = os.times(), time.time()
+			poster.start()
+			runGame(game)
+			poster.join()
+			after, elapsed = os.times(), time.time() - start
+			cpu = (after[0] + after[1] - before[0] - before[1]) / elapsed
+			fields = {'name': name, 'keysPerSecond': keysPerSecond, 'cpu': cpu}
+			if latencies:
+				fields['meanLatency'], fields['maxLatency'] = sum(latencies) / len(latencies), max(latencies)
+				latency = '%8.2f ms mean %8.2f ms max' % (1000 * fields['meanLatency'], 1000 * fields['maxLatency'])
+			else:
+				latency = ''
+			show('%-24s %6d keys/sec %6.1f%% CPU %s' % (name, keysPerSecond, 100 * cpu, latency), **fields)
+	pygame.display.quit()
+
+class NullStream(object):
+	def write(self, s):
+		pass
+
+def benchmarkAscii(sizes):
+	"""Times str() on an object-graph Maze, and writeAscii to a stream that throws the lines away for a CompactMaze - the latter should stay linear with memory bounded by a row."""
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		if cellCount <= 10**6:
+			report('str(Maze)', height * width, timeCall(str, Maze(height, width)))
+		report('CompactMaze.writeAscii', height * width, timeCall(CompactMaze(height, width).writeAscii, NullStream()))
+
+def benchmarkConstruction(sizes):
+	"""Compares the time and memory it takes to build an empty Maze (a Cell object per position) and an empty CompactMaze (a byte per position)."""
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		for mazeClass in [Maze, CompactMaze]:
+			seconds, size = measureInChildProcess(mazeClass, height, width)
+			report('construct %s' % mazeClass.__name__, height * width, seconds, size)
+
+def benchmarkNeighbours(sizes):
+	"""Times asking every cell of a generated maze for its neighbours in each of the ways Cell offers, on a Maze and a CompactMaze."""
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		compactMaze = CompactMaze(height, width)
+		EllersGenerator(compactMaze, rng=FastRandom(1)).generate()
+		for maze in [compactMaze.toMaze(), compactMaze]:
+			cells = list(maze.iterCells())
+			def adjacentCellEachWay():
+				for cell in cells:
+					for direction in directions:
+						cell.getAdjacentCell(direction)
+			def directionOfEachNeighbour():
+				for cell in cells:
+					for neighbour in cell.getAllAdjacentUnblockedCells():
+						cell.getDirectionOfAdjacentCell(neighbour)
+			mazeName = maze.__class__.__name__
+			report('getAdjacentCell x4, %s' % mazeName, height * width, timeCall(adjacentCellEachWay))
+			report('getAllAdjacentCells, %s' % mazeName, height * width, timeCall(lambda: [cell.getAllAdjacentCells() for cell in cells]))
+			report('getAllAdjacentUnblockedCells, %s' % mazeName, height * width, timeCall(lambda: [cell.getAllAdjacentUnblockedCells() for cell in cells]))
+			report('getDirectionOfAdjacentCell, %s' % mazeName, height * width, timeCall(directionOfEachNeighbour))
+
+def benchmarkWallQueries(sizes):
+	"""Compares asking each cell whether its east wall is blocked with Maze.blockedFlags, for the whole maze and for each row in turn, on a Maze and a CompactMaze."""
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		compactMaze = CompactMaze(height, width)
+		EllersGenerator(compactMaze, rng=FastRandom(1)).generate()
+		for maze in [compactMaze.toMaze(), compactMaze]:
+			mazeName = maze.__class__.__name__
+			report('each cell, %s' % mazeName, height * width, timeCall(lambda: bytearray([cell.walls[east] in blocked for cell in maze.iterCells()])))
+			report('blockedFlags, %s' % mazeName, height * width, timeCall(maze.blockedFlags, east))
+			report('blockedFlags by row, %s' % mazeName, height * width, timeCall(lambda: [maze.blockedFlags(east, row, height=1) for row in xrange(height)]))
+
+def drawingSetup(maze):
+	"""Makes a screen on SDL's dummy video driver just big enough for 'maze' with one pixel walls and cells, and returns a MazeUI for it, as a tuple of arguments for measureInChildProcess."""
+	os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+	import pygame
+	import mazeui
+	pygame.display.init()
+	screenWidth, screenHeight = maze.width * 2 + 1, maze.height * 2 + 1
+	screen = pygame.display.set_mode((screenWidth, screenHeight), 0, 32)
+	return (mazeui.MazeUI(maze.width, maze.height, wallWidth=1, screenWidth=screenWidth, screenHeight=screenHeight, screen=screen, innerWidth=1, maze=maze),)
+
+def benchmarkScaling(sizes):
+	"""The basic operations from small mazes to big ones, each in a process of its own, for keeping an eye on between releases: building an empty Maze, generating it with hunt-and-kill, str() of a generated one, drawing it with MazeUI.drawMaze (walls and all, as at the start of a level) and asking each of its cells for its neighbours. Hunt-and-kill takes a few minutes at 2000x2000."""
+	def generate(maze):
+		HuntAndKillGenerator(maze, rng=FastRandom(1)).generate()
+	def drawMaze(mui):
+		mui.drawMaze()
+		mui.updateDisplay()
+	def askForNeighbours(maze):
+		for cell in maze.iterCells():
+			cell.getAllAdjacentCells()
+			cell.getAllAdjacentUnblockedCells()
+	for cellCount in sizes:
+		height, width = dimensionsForCellCount(cellCount)
+		def measure(name, function, *args, **options):
+			seconds, size, objects = measureInChildProcess(function, *args, peak=True, objects=True, **options)
+			report(name, height * width, seconds, size, objects)
+		measure('construct Maze', Maze, height, width)
+		measure('huntandkill', generate, height, width, setup=lambda height, width: (Maze(height, width),))
+		compactMaze = CompactMaze(height, width)		# generated quickly, then copied into a Maze - the rest only need a perfect maze
+		EllersGenerator(compactMaze, rng=FastRandom(1)).generate()
+		maze = compactMaze.toMaze()
+		measure('str(Maze)', str, maze)
+		measure('MazeUI.drawMaze', drawMaze, maze, setup=drawingSetup)
+		measure('neighbour queries', askForNeighbours, maze)
+		del maze
+
+def compareResults(oldPath, newPath, tolerance=0.25):
+	"""Prints each measurement in the JSON output at 'newPath' whose seconds or bytes are more than 'tolerance' (as a fraction) over the same measurement at 'oldPath', and returns how many there were."""
+	def load(path):
+		results = {}
+		for line in open(path):
+			if line.startswith('{'):
+				fields = json.loads(line)
+				key = tuple([fields.get(name) for name in ['benchmark', 'name', 'cells', 'mazes', 'keysPerSecond']])
+				results[key] = fields
+		return results
+	old, new = load(oldPath), load(newPath)
+	regressions = 0
+	for key in sorted(set(old.keys()) & set(new.keys())):
+		for measurement in ['seconds', 'bytes']:
+			before, after = old[key].get(measurement), new[key].get(measurement)
+			if before and after != None and after > before * (1 + tolerance):
+				size = key[2] != None and '%12s cells' % key[2] or '%12s mazes' % key[3]
+				print('%-12s %-24s %s %8s %14.6g -> %14.6g (%+.0f%%)' % (key[0], key[1], size, measurement, before, after, 100.0 * (after - before) / before))
+				regressions += 1
+	return regressions
+
+
+benchmarks = {'huntandkill': (benchmarkHuntAndKill, [10**3, 10**4, 10**5, 10**6]),
+			  'construction': (benchmarkConstruction, [10**4, 10**5, 10**6]),
+			  'logging': (benchmarkLogging, [500 * 500]),
+			  'ascii': (benchmarkAscii, [10**4, 10**6, 5000 * 5000]),
+			  'rowgenerators': (benchmarkRowGenerators, [10**4, 10**6, 10**8]),
+			  'generators': (benchmarkGenerators, [10**4, 10**5]),
+			  'batch': (benchmarkBatch, [100]),
+			  'tiles': (benchmarkTiles, [10**6, 10**7]),
+			  'prefetch': (benchmarkPrefetch, [10**3, 10**4, 10**5]),
+			  'io': (benchmarkIO, [10**4, 10**6, 10**8]),
+			  'stream': (benchmarkStream, [10**6, 10**7, 10**8]),
+			  'solvers': (benchmarkSolvers, [10**4, 10**6, 4000 * 4000]),
+			  'validate': (benchmarkValidate, [10**4, 10**6, 10**7]),
+			  'analytics': (benchmarkAnalytics, [10**4, 10**6, 10**7]),
+			  'analyticsbatch': (benchmarkAnalyticsBatch, [10**3, 10**4]),
+			  'difficulty': (benchmarkDifficulty, [300, 1200, 4800]),
+			  'cache': (benchmarkCache, [1200, 10**5, 10**6]),
+			  'corridors': (benchmarkCorridors, [10**4, 10**6]),
+			  'neighbours': (benchmarkNeighbours, [10**4, 10**6]),
+			  'wallqueries': (benchmarkWallQueries, [10**4, 10**6]),
+			  'frames': (benchmarkFrames, [12, 10**3, 10**4, 200 * 150]),
+			  'eventloop': (benchmarkEventLoop, [0, 10, 50]),
+			  'scaling': (benchmarkScaling, [10 * 10, 100 * 100, 500 * 500, 1000 * 1000, 2000 * 2000])}
+
+if __name__ == '__main__':
+	logging.basicConfig(level=logging.WARNING)	# keep the finished mazes out of the output
+	args = sys.argv[1:]
+	if args[:1] == ['--compare']:
+		sys.exit(compareResults(*args[1:3] + [float(tolerance) for tolerance in args[3:4]]) and 1 or 0)
+	if args[:1] == ['--json']:
+		jsonOutput = True
+		args = args[1:]
+	for currentBenchmark in args[:1] or sorted(benchmarks.keys()):
+		benchmark, defaultSizes = benchmarks[currentBenchmark]
+		benchmark([int(size) for size in args[1:]] or defaultSizes)
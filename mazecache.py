@@ -0,0 +1,96 @@
+
+import os
+import collections
+import mazeio
+from maze import *
+from mazegenerators import generatorNamed
+from mazebatch import generatePackedWalls
+
+# Keeps generated mazes around so the same one isn't generated over and over. A maze is fixed by
+# the generator that made it, its size and its seed (see mazebatch.generatePackedWalls), so that's
+# what it's cached under. The cache holds just each maze's packed walls - a byte per cell - as
+# strings in least recently used order, and throws the oldest out once they add up to more than
+# the byte limit. With a directory, mazes are also kept there in the mazeio file format, a
+# quarter of a byte per cell, so they outlast the process and anything thrown out of memory can
+# be read back rather than generated again. Nothing's ever deleted from the directory.
+#
+# Asking for a maze gets a CompactMaze, whose cells are only made as they're used; toMaze turns
+# that into a Maze with a real Cell at every position, for callers that need that.
+
+class MazeCache(object):
+	def __init__(self, maxBytes=64 * 1024 * 1024, directory=None):
+		self.maxBytes = maxBytes		# the most packed wall bytes kept in memory
+		self.directory = directory		# where to keep mazes on disk, or None to keep them only in memory
+		self.entries = collections.OrderedDict()		# key -> packed walls, least recently used first
+		self.bytes = 0
+		self.hits = 0			# found in memory
+		self.diskHits = 0		# read from the directory
+		self.misses = 0			# generated
+		self.evictions = 0		# thrown out of memory to make room
+
+	def get(self, height, width, seed, algorithm='huntandkill'):
+		"""returns the 'height' by 'width' maze that the generator registered as 'algorithm' (see mazegenerators.generators) makes from 'seed', as a CompactMaze of its own"""
+		return CompactMaze(height, width, self.packedWalls(height, width, seed, algorithm))
+
+	def getMaze(self, height, width, seed, algorithm='huntandkill'):
+		"""like get, but returns a Maze with a Cell object for each position"""
+		return self.get(height, width, seed, algorithm).toMaze()
+
+	def packedWalls(self, height, width, seed, algorithm='huntandkill'):
+		"""Returns the packed walls of the maze get would return, as a string. It's the one the cache keeps, not a copy, which is fine as strings can't be changed."""
+		key = (algorithm, height, width, seed)
+		wallBytes = self.entries.pop(key, None)
+		if wallBytes != None:
+			self.hits += 1
+			self.entries[key] = wallBytes		# back in as the most recently used
+			return wallBytes
+		generatorClass = generatorNamed(algorithm)
+		wallBytes = self.load(key)
+		if wallBytes != None:
+			self.diskHits += 1
+		else:
+			self.misses += 1
+			wallBytes = generatePackedWalls((height, width, seed, generatorClass))
+			self.save(key, wallBytes)
+		self.remember(key, wallBytes)
+		return wallBytes
+
+	def remember(self, key, wallBytes):
+		if len(wallBytes) > self.maxBytes:
+			return			# it would push everything else out and still not fit
+		self.entries[key] = wallBytes
+		self.bytes += len(wallBytes)
+		while self.bytes > self.maxBytes:
+			oldKey, oldBytes = self.entries.popitem(last=False)
+			self.bytes -= len(oldBytes)
+			self.evictions += 1
+
+	def pathFor(self, key):
+		"""returns the path the maze cached under 'key' is kept at in the directory"""
+		return os.path.join(self.directory, '%s-%sx%s-%s.maze' % key)
+
+	def load(self, key):
+		"""returns the packed walls of the maze kept in the directory under 'key', or None if there isn't one"""
+		if self.directory == None or not os.path.exists(self.pathFor(key)):
+			return None
+		return str(mazeio.load(self.pathFor(key)).wallBytes)
+
+	def save(self, key, wallBytes):
+		if self.directory == None:
+			return
+		algorithm, height, width, seed = key
+		path = self.pathFor(key)
+		partPath = '%s.%s.part' % (path, os.getpid())
+		mazeio.save(CompactMaze(height, width, wallBytes), partPath)
+		os.rename(partPath, path)		# so no other process reads it half written
+
+	def clear(self):
+		"""forgets every maze kept in memory, but not the counts or anything in the directory"""
+		self.entries.clear()
+		self.bytes = 0
+
+	def __len__(self):
+		return len(self.entries)
+
+	def __repr__(self):
+		return '<MazeCache: %s mazes, %s bytes, %s hits, %s disk hits, %s misses, %s evictions>' % (len(self), self.bytes, self.hits, self.diskHits, self.misses, self.evictions)
@@ -0,0 +1,94 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+from mazecache import *
+from mazebatch import generatePackedWalls
+from mazegenerators import EllersGenerator
+
+
+class MazeCacheTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def counts(self, cache):
+		return (cache.hits, cache.diskHits, cache.misses, cache.evictions)
+
+	def testSameMazeAsGeneratingIt(self):
+		cache = MazeCache()
+		m = cache.get(7, 9, 3)
+		self.assertEqual(CompactMaze, type(m))
+		self.assertEqual(generatePackedWalls((7, 9, 3, HuntAndKillGenerator)), str(m.packedWalls()))
+		self.assertEqual(generatePackedWalls((7, 9, 3, EllersGenerator)), str(cache.get(7, 9, 3, 'ellers').packedWalls()))
+		self.assertNotEqual(str(m), str(cache.get(7, 9, 4)))
+		self.assertEqual((0, 0, 3, 0), self.counts(cache))
+
+	def testHits(self):
+		cache = MazeCache()
+		first = cache.get(5, 6, 1)
+		self.assertEqual(str(first), str(cache.get(5, 6, 1)))
+		self.assertEqual((1, 0, 1, 0), self.counts(cache))
+		self.assert_(cache.packedWalls(5, 6, 1) is cache.packedWalls(5, 6, 1))
+		self.assertEqual(30, cache.bytes)
+
+	def testMazesAreCallersOwn(self):
+		cache = MazeCache()
+		m = cache.get(4, 4, 2)
+		before = str(m)
+		m.cells[1][1].openPassageInDirection(south)
+		m.cells[1][1].openPassageInDirection(east)
+		self.assertEqual(before, str(cache.get(4, 4, 2)))
+		full = cache.getMaze(4, 4, 2)
+		self.assertEqual(Maze, type(full))
+		self.assertEqual(before, str(full))
+
+	def testEvictsLeastRecentlyUsed(self):
+		cache = MazeCache(maxBytes=100)		# room for two 5x10 mazes
+		cache.get(5, 10, 1)
+		cache.get(5, 10, 2)
+		cache.get(5, 10, 1)
+		cache.get(5, 10, 3)		# pushes out seed 2, used longest ago
+		self.assertEqual((1, 0, 3, 1), self.counts(cache))
+		self.assertEqual(2, len(cache))
+		self.assertEqual(100, cache.bytes)
+		cache.get(5, 10, 1)
+		self.assertEqual(2, cache.hits)
+		cache.get(5, 10, 2)
+		self.assertEqual((2, 0, 4, 2), self.counts(cache))
+
+	def testMazeBiggerThanTheCacheIsntKept(self):
+		cache = MazeCache(maxBytes=100)
+		cache.get(5, 10, 1)
+		cache.get(10, 11, 1)
+		self.assertEqual(1, len(cache))
+		self.assertEqual(0, cache.evictions)
+
+	def testDiskTier(self):
+		cache = MazeCache(maxBytes=0, directory=self.directory)
+		m = cache.get(6, 7, 5, 'kruskals')
+		self.assertEqual(['kruskals-6x7-5.maze'], os.listdir(self.directory))
+		self.assertEqual(str(m), str(cache.get(6, 7, 5, 'kruskals')))
+		self.assertEqual((0, 1, 1, 0), self.counts(cache))
+		another = MazeCache(directory=self.directory)
+		self.assertEqual(str(m), str(another.get(6, 7, 5, 'kruskals')))
+		another.get(6, 7, 5, 'kruskals')
+		self.assertEqual((1, 1, 0, 0), self.counts(another))
+
+	def testClear(self):
+		cache = MazeCache()
+		cache.get(3, 3, 1)
+		cache.clear()
+		self.assertEqual((0, 0), (len(cache), cache.bytes))
+		cache.get(3, 3, 1)
+		self.assertEqual(2, cache.misses)
+
+	def testUnknownAlgorithm(self):
+		self.assertRaises(ValueError, MazeCache().get, 3, 3, 1, 'nonesuch')
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,105 @@
+
+import sys
+import random
+import itertools
+import multiprocessing
+from maze import *
+from mazebatch import emptyMazeFor
+from mazesolver import solveBFS
+from mazeanalytics import mazeStats
+
+# Generates mazes to order: candidates are generated from one seed after another, across a pool
+# of worker processes, until one has a solution length and number of dead ends in the ranges
+# asked for. With hunt-and-kill, a candidate whose solution is the wrong length is given up on
+# part way through rather than finished and thrown away (see EarlyRejection).
+
+class Difficulty(object):
+	"""What a maze has to be like to be accepted: a (least, most) range for the number of moves from the start to the finish, and another for the number of dead ends. Either end of either range can be None, for no limit."""
+	def __init__(self, solutionLength=(None, None), deadEnds=(None, None)):
+		for least, most in [solutionLength, deadEnds]:
+			if least != None and most != None and least > most:
+				raise ValueError('the range (%s, %s) is empty' % (least, most))
+		self.solutionLength = solutionLength
+		self.deadEnds = deadEnds
+
+	def accepts(self, stats):
+		"""returns True if a maze with these MazeStats (see mazeanalytics) is as difficult as asked for"""
+		return stats.solutionLength != None and inRange(stats.solutionLength, self.solutionLength) and inRange(stats.deadEnds(), self.deadEnds)
+
+	def __repr__(self):
+		return '<Difficulty: solution length %s, dead ends %s>' % (self.solutionLength, self.deadEnds)
+
+def inRange(value, limits):
+	least, most = limits
+	return (least == None or value >= least) and (most == None or value <= most)
+
+class HopelessMaze(Exception):
+	"""raised by EarlyRejection to stop generating a maze that can't meet the difficulty"""
+
+class EarlyRejection(object):
+	"""A stepHook for HuntAndKillGenerator that raises HopelessMaze as soon as the maze being generated can't meet the solution length in 'difficulty'. Hunt-and-kill grows a single tree of passages, so once the start and finish have both been visited the path between them is final, and it's checked there and then.
+	The number of dead ends isn't checked: only a visited cell with no unvisited neighbours is sure to stay a dead end, and only a cell with two openings sure not to be one, and hunt-and-kill settles most of them in its last few steps, so counting them part way through costs more than giving up then saves."""
+	def __init__(self, difficulty, maze, start, finish):
+		self.difficulty = difficulty
+		self.maze = maze
+		self.start = start
+		self.finish = finish
+		self.checked = False
+
+	def __call__(self, generator):
+		if not self.checked and generator.visitedMap[self.start] and generator.visitedMap[self.finish]:
+			self.checked = True
+			solutionLength = len(solveBFS(self.maze, self.start, self.finish)) - 1
+			if not inRange(solutionLength, self.difficulty.solutionLength):
+				raise HopelessMaze('the solution is %s moves long' % solutionLength)
+
+def attemptMaze(task):
+	"""Worker: generates a maze for a (height, width, seed, difficulty, generatorClass, rejectEarly) task. Returns (packed walls as a string, False) if it meets the difficulty, and (None, whether it was given up on part way through) if it doesn't."""
+	height, width, seed, difficulty, generatorClass, rejectEarly = task
+	maze = emptyMazeFor(generatorClass, height, width)
+	if rejectEarly and difficulty.solutionLength != (None, None) and issubclass(generatorClass, HuntAndKillGenerator):
+		hook = EarlyRejection(difficulty, maze, maze.startCell.ordinal(), maze.finishCell.ordinal())
+		generator = generatorClass(maze, stepHook=hook, rng=random.Random(seed))
+	else:
+		generator = generatorClass(maze, rng=random.Random(seed))
+	try:
+		generator.generate()
+	except HopelessMaze:
+		return None, True
+	if difficulty.accepts(mazeStats(maze)):
+		return str(maze.packedWalls()), False
+	return None, False
+
+class TargetedMaze(object):
+	def __init__(self, maze, stats, attempts, rejectedEarly):
+		self.maze = maze			# a CompactMaze
+		self.stats = stats			# its MazeStats
+		self.attempts = attempts			# how many candidates were tried, this one included
+		self.rejectedEarly = rejectedEarly		# how many of the others were given up on part way through
+
+def generateForDifficulty(height, width, difficulty, generatorClass=HuntAndKillGenerator, rng=None, processes=None, maxAttempts=1000, rejectEarly=True, chunksize=1):
+	"""Generates 'height' by 'width' candidate mazes with 'generatorClass', seeded from 'rng' (see makeRng), across 'processes' worker processes (by default one per CPU), and returns a TargetedMaze for the first that meets 'difficulty'. Candidates are taken in the order their seeds were picked, so the same rng seed gives the same maze however many processes there are; with processes=1 they're tried in this process, without the cost of starting a pool. With 'rejectEarly', hunt-and-kill candidates are given up on as soon as their solution length is known to be wrong. Raises ValueError if none of 'maxAttempts' candidates does."""
+	rng = makeRng(rng)
+	tasks = [(height, width, rng.randrange(sys.maxint), difficulty, generatorClass, rejectEarly) for attempt in xrange(maxAttempts)]
+	if processes == 1:
+		targeted = firstAccepted(height, width, itertools.imap(attemptMaze, tasks))
+	else:
+		pool = multiprocessing.Pool(processes)
+		try:
+			targeted = firstAccepted(height, width, pool.imap(attemptMaze, tasks, chunksize))
+		finally:
+			pool.terminate()
+			pool.join()
+	if targeted == None:
+		raise ValueError('none of %s %sx%s mazes met %s' % (maxAttempts, height, width, difficulty))
+	return targeted
+
+def firstAccepted(height, width, results):
+	"""returns a TargetedMaze for the first maze accepted in 'results' from attemptMaze, or None if there isn't one"""
+	rejectedEarly = 0
+	for attempt, (wallBytes, gaveUp) in enumerate(results):
+		if wallBytes != None:
+			maze = CompactMaze(height, width, wallBytes)
+			return TargetedMaze(maze, mazeStats(maze), attempt + 1, rejectedEarly)
+		rejectedEarly += gaveUp
+	return None
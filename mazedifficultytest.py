@@ -0,0 +1,68 @@
+
+import random
+import unittest
+from mazedifficulty import *
+from mazegenerators import EllersGenerator
+
+
+class DifficultyTest(unittest.TestCase):
+	def testAccepts(self):
+		stats = mazeStats(getGeneratedMaze(1))
+		self.assertEqual(True, Difficulty().accepts(stats))
+		self.assertEqual(True, Difficulty(solutionLength=(stats.solutionLength, None)).accepts(stats))
+		self.assertEqual(False, Difficulty(solutionLength=(stats.solutionLength + 1, None)).accepts(stats))
+		self.assertEqual(True, Difficulty(deadEnds=(None, stats.deadEnds())).accepts(stats))
+		self.assertEqual(False, Difficulty(deadEnds=(None, stats.deadEnds() - 1)).accepts(stats))
+
+	def testEmptyRange(self):
+		self.assertRaises(ValueError, Difficulty, (10, 9))
+		self.assertRaises(ValueError, Difficulty, (None, None), (3, 2))
+
+
+class EarlyRejectionTest(unittest.TestCase):
+	def testGivesUpOnlyOnMazesThatWouldBeRejected(self):
+		difficulty = Difficulty(solutionLength=(40, None), deadEnds=(None, 14))
+		givenUp = accepted = 0
+		for seed in range(40):
+			task = (10, 12, seed, difficulty, HuntAndKillGenerator)
+			early, late = attemptMaze(task + (True,)), attemptMaze(task + (False,))
+			self.assertEqual(late[0], early[0])
+			self.assertEqual(False, late[1])
+			givenUp += early[1]
+			accepted += early[0] != None
+		self.assert_(givenUp > 0)
+		self.assert_(accepted > 0)
+
+
+class GenerateForDifficultyTest(unittest.TestCase):
+	def testMeetsTheDifficulty(self):
+		difficulty = Difficulty(solutionLength=(40, None), deadEnds=(None, 14))
+		targeted = generateForDifficulty(10, 12, difficulty, rng=3, processes=2)
+		self.assertEqual(True, difficulty.accepts(mazeStats(targeted.maze)))
+		self.assertEqual(targeted.stats.solutionLength, mazeStats(targeted.maze).solutionLength)
+		self.assert_(targeted.attempts > targeted.rejectedEarly)
+
+	def testSameMazeHoweverManyProcesses(self):
+		difficulty = Difficulty(solutionLength=(40, None))
+		onOne = generateForDifficulty(10, 12, difficulty, rng=5, processes=1)
+		onThree = generateForDifficulty(10, 12, difficulty, rng=5, processes=3)
+		self.assertEqual(str(onOne.maze), str(onThree.maze))
+		self.assertEqual(onOne.attempts, onThree.attempts)
+
+	def testOtherGenerators(self):
+		targeted = generateForDifficulty(10, 12, Difficulty(deadEnds=(30, None)), EllersGenerator, rng=1, processes=1)
+		self.assert_(targeted.stats.deadEnds() >= 30)
+		self.assertEqual(0, targeted.rejectedEarly)
+
+	def testImpossible(self):
+		self.assertRaises(ValueError, generateForDifficulty, 4, 4, Difficulty(solutionLength=(16, None)), rng=1, processes=1, maxAttempts=5)
+
+
+def getGeneratedMaze(seed):
+	m = Maze(10, 12)
+	HuntAndKillGenerator(m, rng=random.Random(seed)).generate()
+	return m
+
+
+if __name__ == '__main__':
+	unittest.main()
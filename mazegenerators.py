@@ -0,0 +1,326 @@
+
+import binascii
+from array import array
+from maze import *
+
+# Generators that build a CompactMaze a whole row at a time, instead of stepping cell by cell
+# through the Cell API like HuntAndKillGenerator does.
+#
+# Each algorithm only has to say, for every row, which cells have their east wall opened and
+# which have their south wall opened. Those flags are kept as "lane" ints: one byte per cell,
+# first cell in the most significant byte, each byte 0 or 1. Python does bitwise operations on
+# big ints in C, so shifting a lane int by 8 bits lines every cell up with its neighbour, and a
+# handful of shifts and ors turns a row of flags into a row of packed wall bytes (see packRow) -
+# there's no per-cell Python code unless the algorithm itself needs it.
+
+def laneMask(width):
+	"""returns a lane int with every cell's flag set"""
+	return int('01' * width, 16)
+
+def flagsToLanes(flags):
+	"""returns the lane int for a bytearray (or list) of 0/1 flags"""
+	return int(binascii.hexlify(bytearray(flags)), 16)
+
+def lanesToFlags(lanes, width):
+	"""returns a bytearray of 0/1 flags, one per cell, for a lane int"""
+	return bytearray(binascii.unhexlify('%0*x' % (2 * width, lanes)))
+
+# maps a cell's passage code - 1 for east, 2 for south, 4 for west, 8 for north - to its packed walls
+packedForPassageCode = ''.join([chr(packWalls([passage if code & 8 else wall,
+											   passage if code & 1 else wall,
+											   passage if code & 2 else wall,
+											   passage if code & 4 else wall])) for code in range(16)] + ['\0'] * 240)
+
+def packRow(east, south, southAbove, width):
+	"""Returns a row's packed wall bytes, given lane ints for the cells that open their east and south walls. 'southAbove' is the previous row's south flags, which are this row's north passages, and each cell's west passage is its left neighbour's east one."""
+	codes = east | (south << 1) | ((east >> 8) << 2) | (southAbove << 3)
+	return lanesToFlags(codes, width).translate(packedForPassageCode)
+
+
+class RowGenerator(object):
+	"""Base class for the row-at-a-time generators. Subclasses implement iterRows, yielding an (east, south) pair of lane ints for each row from top to bottom. 'rng' is as for HuntAndKillGenerator - see makeRng."""
+	def __init__(self, maze, rng=None):
+		self.maze = maze
+		self.rng = makeRng(rng)
+
+	def generate(self):
+		width = self.maze.width
+		wallBytes = self.maze.wallBytes
+		southAbove = 0
+		start = 0
+		for east, south in self.iterRows():
+			wallBytes[start:start + width] = packRow(east, south, southAbove, width)
+			southAbove = south
+			start += width
+		self.maze.setEdgesToPermanentWalls()	# the rows were written over the edges, so put them back
+		self.maze.wallsChanged()
+
+
+# Binary tree: every cell opens either its east or its south wall, chosen at random. Cells in the
+# last column can only go south and cells in the last row can only go east, which leaves the
+# bottom right cell as the root of the tree. Every row is independent, so a whole row's choices
+# come from one call for random bits.
+class BinaryTreeGenerator(RowGenerator):
+	def iterRows(self):
+		height, width = self.maze.height, self.maze.width
+		allCells = laneMask(width)
+		allButLastColumn = allCells & ~1
+		for row in xrange(height - 1):
+			east = self.rng.getrandbits(8 * width) & allButLastColumn
+			yield east, allCells ^ east
+		yield allButLastColumn, 0
+
+
+# Sidewinder: each row is split into runs of cells joined east to west - a run continues east at
+# random and always stops at the last column. Each run then opens the south wall of one of its
+# cells, picked at random, and the last row is a single run with no way south. The east choices
+# come a row at a time, but picking a cell per run is a loop over the runs.
+class SidewinderGenerator(RowGenerator):
+	def iterRows(self):
+		height, width = self.maze.height, self.maze.width
+		allButLastColumn = laneMask(width) & ~1
+		for row in xrange(height - 1):
+			east = self.rng.getrandbits(8 * width) & allButLastColumn
+			eastFlags = lanesToFlags(east, width)
+			south = bytearray(width)
+			runStart = 0
+			runEnd = eastFlags.find('\0')
+			while runEnd != -1:
+				south[self.rng.randint(runStart, runEnd)] = 1
+				runStart = runEnd + 1
+				runEnd = eastFlags.find('\0', runStart)
+			yield east, flagsToLanes(south)
+		yield allButLastColumn, 0
+
+
+# Eller's: keeps track of which cells in the current row are already connected (their "set") and
+# only needs that one row of state. Adjacent cells in different sets are joined east at random,
+# then every set opens at least one south wall so nothing gets cut off; cells below that weren't
+# reached start new sets of their own. The last row joins every remaining set together.
+class EllersGenerator(RowGenerator):
+	def iterRows(self):
+		height, width = self.maze.height, self.maze.width
+		sets = range(width)				# the set each cell in the current row belongs to
+		nextSet = width
+		for row in xrange(height):
+			lastRow = (row == height - 1)
+			east = bytearray(width)
+			members = {}
+			for col in range(width):
+				members.setdefault(sets[col], []).append(col)
+			for col in range(width - 1):
+				a, b = sets[col], sets[col + 1]
+				if a != b and (lastRow or self.rng.random() < 0.5):
+					east[col] = 1
+					if len(members[a]) < len(members[b]): a, b = b, a	# relabel the smaller set
+					for member in members[b]:
+						sets[member] = a
+					members[a].extend(members.pop(b))
+
+			south = bytearray(width)
+			if not lastRow:
+				for cols in members.itervalues():
+					south[self.rng.choice(cols)] = 1
+					for col in cols:
+						if self.rng.random() < 0.5: south[col] = 1
+				for col in range(width):
+					if not south[col]:
+						sets[col] = nextSet
+						nextSet += 1
+			yield flagsToLanes(east), flagsToLanes(south)
+
+
+class CellGenerator(object):
+	"""Base class for generators that carve a maze a passage at a time, working on ordinals and keeping their bookkeeping in flat arrays, and opening passages through the Cell API so they work on a Maze or a CompactMaze. Subclasses implement generate. 'rng' is as for HuntAndKillGenerator - see makeRng."""
+	def __init__(self, maze, rng=None):
+		self.maze = maze
+		self.rng = makeRng(rng)
+		width = maze.width
+		# the direction from a cell to the neighbour a given ordinal offset away (north and south win
+		# when the maze is one cell wide, and there are no east or west neighbours to mix them up with)
+		self.directionOfOffset = {1: east, -1: west, width: south, -width: north}
+
+	def neighbourOrdinals(self, ordinal):
+		"""returns the ordinals of the cells next to 'ordinal', north, east, south and west, skipping any off the edge"""
+		height, width = self.maze.height, self.maze.width
+		row, col = divmod(ordinal, width)
+		neighbours = []
+		if row > 0: neighbours.append(ordinal - width)
+		if col < width - 1: neighbours.append(ordinal + 1)
+		if row < height - 1: neighbours.append(ordinal + width)
+		if col > 0: neighbours.append(ordinal - 1)
+		return neighbours
+
+	def openPassage(self, ordinal, neighbour):
+		self.maze.ordinalToCell(ordinal).openPassageInDirection(self.directionOfOffset[neighbour - ordinal])
+
+
+# Recursive backtracker: a random walk that only steps onto unvisited cells, backing up when it
+# gets stuck until it finds a cell with an unvisited neighbour. The path back is kept as an
+# explicit stack of ordinals rather than Python recursion, so there's no recursion limit, and each
+# cell is pushed and popped once. Makes long, winding passages with few dead ends.
+class RecursiveBacktrackerGenerator(CellGenerator):
+	def generate(self):
+		visited = bytearray(self.maze.height * self.maze.width)
+		start = self.rng.randrange(len(visited))
+		visited[start] = 1
+		stack = array('l', [start])
+		while stack:
+			ordinal = stack[-1]
+			unvisited = [neighbour for neighbour in self.neighbourOrdinals(ordinal) if not visited[neighbour]]
+			if unvisited:
+				neighbour = self.rng.choice(unvisited)
+				self.openPassage(ordinal, neighbour)
+				visited[neighbour] = 1
+				stack.append(neighbour)
+			else:
+				stack.pop()
+
+
+# Wilson's: every spanning tree is equally likely. Starting with one cell in the maze, a random
+# walk from a cell that isn't in yet wanders until it hits the maze, then the walk - with any loops
+# it made erased - becomes a passage. The loop erasure is free: the walk just records, per cell,
+# the way it last left it (in a flat array), and following those from the start skips the loops.
+# Walks take a while to find the maze at first, so it's linear in the cells but not in the steps.
+class WilsonsGenerator(CellGenerator):
+	def generate(self):
+		cellCount = self.maze.height * self.maze.width
+		inMaze = bytearray(cellCount)
+		inMaze[self.rng.randrange(cellCount)] = 1
+		exitTo = array('l', [-1]) * cellCount		# where the current walk last went from each cell
+		for start in xrange(cellCount):
+			if inMaze[start]:
+				continue
+			ordinal = start
+			while not inMaze[ordinal]:
+				exitTo[ordinal] = self.rng.choice(self.neighbourOrdinals(ordinal))
+				ordinal = exitTo[ordinal]
+			ordinal = start
+			while not inMaze[ordinal]:
+				inMaze[ordinal] = 1
+				self.openPassage(ordinal, exitTo[ordinal])
+				ordinal = exitTo[ordinal]
+
+
+# Kruskal's: every wall between two cells, in random order, is opened if the cells either side
+# aren't connected yet. Which cells are connected is tracked with a union-find over ordinals -
+# path halving and union by rank keep each lookup close to constant time.
+class KruskalsGenerator(CellGenerator):
+	def generate(self):
+		height, width = self.maze.height, self.maze.width
+		cellCount = height * width
+		self.parent = array('l', xrange(cellCount))
+		self.rank = bytearray(cellCount)
+		# each wall is the ordinal of the cell to its north or west, times two, plus 1 if it's that cell's south wall
+		walls = [ordinal * 2 for ordinal in xrange(cellCount) if ordinal % width < width - 1]
+		walls.extend([ordinal * 2 + 1 for ordinal in xrange(cellCount - width)])
+		self.rng.shuffle(walls)
+		passagesLeft = cellCount - 1
+		for wallCode in walls:
+			if passagesLeft == 0:
+				break
+			ordinal = wallCode >> 1
+			neighbour = ordinal + (width if wallCode & 1 else 1)
+			if self.union(ordinal, neighbour):
+				self.openPassage(ordinal, neighbour)
+				passagesLeft -= 1
+
+	def find(self, ordinal):
+		parent = self.parent
+		while parent[ordinal] != ordinal:
+			parent[ordinal] = parent[parent[ordinal]]		# path halving
+			ordinal = parent[ordinal]
+		return ordinal
+
+	def union(self, a, b):
+		"""joins the sets 'a' and 'b' are in, returning False if they were already the same set"""
+		a, b = self.find(a), self.find(b)
+		if a == b:
+			return False
+		if self.rank[a] < self.rank[b]: a, b = b, a
+		self.parent[b] = a
+		if self.rank[a] == self.rank[b]: self.rank[a] += 1
+		return True
+
+
+# Prim's: grows the maze out from one cell by repeatedly picking a random cell on its frontier (the
+# cells next to the maze but not in it) and joining it to a random neighbour that's in. The
+# frontier's a list with an index per ordinal, like HuntAndKillGenerator's unvisited list, so
+# taking out a random cell is a swap with the last one instead of a shift.
+class PrimsGenerator(CellGenerator):
+	def generate(self):
+		cellCount = self.maze.height * self.maze.width
+		inMaze = bytearray(cellCount)
+		frontierIndex = array('l', [-1]) * cellCount		# where each ordinal is in frontier, or -1
+		frontier = []
+		def addToMaze(ordinal):
+			inMaze[ordinal] = 1
+			for neighbour in self.neighbourOrdinals(ordinal):
+				if not inMaze[neighbour] and frontierIndex[neighbour] < 0:
+					frontierIndex[neighbour] = len(frontier)
+					frontier.append(neighbour)
+		addToMaze(self.rng.randrange(cellCount))
+		while frontier:
+			index = self.rng.randrange(len(frontier))
+			ordinal = frontier[index]
+			last = frontier.pop()
+			if last != ordinal:
+				frontier[index] = last
+				frontierIndex[last] = index
+			frontierIndex[ordinal] = -1
+			self.openPassage(ordinal, self.rng.choice([neighbour for neighbour in self.neighbourOrdinals(ordinal) if inMaze[neighbour]]))
+			addToMaze(ordinal)
+
+
+# Growing tree: keeps a list of active cells, and each step carves from one of them to an
+# unvisited neighbour (which becomes active too), or retires it if there's none. Which one is
+# picked decides the maze - always the newest behaves like the recursive backtracker, always a
+# random one like Prim's - so it's the newest with probability 'newestChance' and random
+# otherwise. Retired cells are taken out without reordering the rest, so the newest is always
+# the last one added.
+class GrowingTreeGenerator(CellGenerator):
+	def __init__(self, maze, rng=None, newestChance=0.5):
+		CellGenerator.__init__(self, maze, rng)
+		self.newestChance = newestChance
+
+	def generate(self):
+		visited = bytearray(self.maze.height * self.maze.width)
+		start = self.rng.randrange(len(visited))
+		visited[start] = 1
+		active = [start]
+		while active:
+			if self.rng.random() < self.newestChance:
+				index = len(active) - 1
+			else:
+				index = self.rng.randrange(len(active))
+			ordinal = active[index]
+			unvisited = [neighbour for neighbour in self.neighbourOrdinals(ordinal) if not visited[neighbour]]
+			if unvisited:
+				neighbour = self.rng.choice(unvisited)
+				self.openPassage(ordinal, neighbour)
+				visited[neighbour] = 1
+				active.append(neighbour)
+			else:
+				del active[index]
+
+
+# every generator, by name - cell generators work on any maze, while row generators need a CompactMaze
+generators = {'huntandkill': HuntAndKillGenerator,
+			  'backtracker': RecursiveBacktrackerGenerator,
+			  'wilsons': WilsonsGenerator,
+			  'kruskals': KruskalsGenerator,
+			  'prims': PrimsGenerator,
+			  'growingtree': GrowingTreeGenerator,
+			  'binarytree': BinaryTreeGenerator,
+			  'sidewinder': SidewinderGenerator,
+			  'ellers': EllersGenerator}
+
+def generatorNamed(name):
+	"""returns the generator class registered as 'name' in generators, raising ValueError for a name that isn't there"""
+	if name not in generators:
+		raise ValueError('no generator called %r - try one of %s' % (name, ', '.join(sorted(generators.keys()))))
+	return generators[name]
+
+def registerGenerator(name, generatorClass):
+	"""Adds a generator to generators, so it can be picked by name. It needs to take a maze and an 'rng' keyword (see makeRng) and have a generate method."""
+	generators[name] = generatorClass
@@ -0,0 +1,169 @@
+
+import unittest
+from mazegenerators import *
+
+
+class LaneTest(unittest.TestCase):
+	def testFlagsRoundTrip(self):
+		self.assertEqual(0x01000101, flagsToLanes([1, 0, 1, 1]))
+		self.assertEqual(bytearray([1, 0, 1, 1]), lanesToFlags(0x01000101, 4))
+		self.assertEqual(bytearray([0, 0, 0, 1]), lanesToFlags(1, 4))
+		self.assertEqual(0x01010101, laneMask(4))
+
+	def testPackRowMatchesOpeningPassagesByHand(self):
+		# the finished test maze from mazetest, a row at a time
+		m = CompactMaze(3,4)
+		m.cells[0][1].openPassageInDirection(east)
+		m.cells[0][1].openPassageInDirection(west)
+		m.cells[0][3].openPassageInDirection(west)
+		m.cells[0][3].openPassageInDirection(south)
+		for direction in directions:
+			m.cells[1][1].openPassageInDirection(direction)
+		m.cells[2][0].openPassageInDirection(east)
+		m.cells[2][3].openPassageInDirection(north)
+		m.cells[2][3].openPassageInDirection(west)
+		rows = [(flagsToLanes([1, 1, 1, 0]), flagsToLanes([0, 1, 0, 1])),
+				(flagsToLanes([1, 1, 0, 0]), flagsToLanes([0, 1, 0, 1])),
+				(flagsToLanes([1, 0, 1, 0]), 0)]
+		packed = bytearray()
+		southAbove = 0
+		for eastLanes, southLanes in rows:
+			packed += packRow(eastLanes, southLanes, southAbove, 4)
+			southAbove = southLanes
+		m2 = CompactMaze(3,4)
+		m2.wallBytes[:] = packed
+		m2.setEdgesToPermanentWalls()
+		self.assertEqual(m.wallBytes, m2.wallBytes)
+
+
+class RowGeneratorTest(unittest.TestCase):
+	def testBinaryTree(self):
+		for height, width in [(1,1), (1,5), (5,1), (7,9), (20,13)]:
+			m = CompactMaze(height, width)
+			BinaryTreeGenerator(m).generate()
+			assertPerfectMaze(self, m)
+
+	def testSidewinder(self):
+		for height, width in [(1,1), (1,5), (5,1), (7,9), (20,13)]:
+			m = CompactMaze(height, width)
+			SidewinderGenerator(m).generate()
+			assertPerfectMaze(self, m)
+
+	def testEllers(self):
+		for height, width in [(1,1), (1,5), (5,1), (7,9), (20,13)]:
+			m = CompactMaze(height, width)
+			EllersGenerator(m).generate()
+			assertPerfectMaze(self, m)
+
+	def testSameSeedGeneratesSameMaze(self):
+		for generatorClass in [BinaryTreeGenerator, SidewinderGenerator, EllersGenerator]:
+			m1, m2, m3 = CompactMaze(9,11), CompactMaze(9,11), CompactMaze(9,11)
+			generatorClass(m1, rng=12).generate()
+			generatorClass(m2, rng=12).generate()
+			generatorClass(m3, rng=13).generate()
+			self.assertEqual(m1.wallBytes, m2.wallBytes)
+			self.assertNotEqual(m1.wallBytes, m3.wallBytes)
+
+	def testEdgesStayPermanent(self):
+		m = CompactMaze(4,4)
+		EllersGenerator(m).generate()
+		self.assertEqual(permanentwall, m.cells[0][0].walls[north])
+		self.assertEqual(permanentwall, m.cells[3][3].walls[east])
+		self.assertEqual(permanentwall, m.cells[3][0].walls[south])
+
+
+cellGenerators = [RecursiveBacktrackerGenerator, WilsonsGenerator, KruskalsGenerator, PrimsGenerator, GrowingTreeGenerator]
+
+class CellGeneratorTest(unittest.TestCase):
+	def testEachMakesAPerfectMaze(self):
+		for generatorClass in cellGenerators:
+			for height, width in [(1,1), (1,5), (5,1), (7,9), (20,13)]:
+				for m in [Maze(height, width), CompactMaze(height, width)]:
+					generatorClass(m, rng=height * width).generate()
+					assertPerfectMaze(self, m)
+
+	def testEdgesStayPermanent(self):
+		for generatorClass in cellGenerators:
+			m = Maze(4,4)
+			generatorClass(m, rng=1).generate()
+			self.assertEqual(permanentwall, m.cells[0][0].walls[north])
+			self.assertEqual(permanentwall, m.cells[3][3].walls[east])
+
+	def testSameSeedGeneratesSameMaze(self):
+		for generatorClass in cellGenerators:
+			m1, m2, m3 = Maze(9,11), Maze(9,11), Maze(9,11)
+			generatorClass(m1, rng=12).generate()
+			generatorClass(m2, rng=12).generate()
+			generatorClass(m3, rng=13).generate()
+			self.assertEqual(str(m1), str(m2))
+			self.assertNotEqual(str(m1), str(m3))
+
+	def testNeighbourOrdinals(self):
+		g = CellGenerator(Maze(3,4))
+		self.assertEqual([1, 4], g.neighbourOrdinals(0))
+		self.assertEqual([1, 6, 9, 4], g.neighbourOrdinals(5))
+		self.assertEqual([7, 10], g.neighbourOrdinals(11))
+		self.assertEqual([0, 2], CellGenerator(Maze(3,1)).neighbourOrdinals(1))
+
+	def testKruskalsUnionFind(self):
+		g = KruskalsGenerator(Maze(2,2))
+		g.parent, g.rank = array('l', range(4)), bytearray(4)
+		self.assertEqual(True, g.union(0, 1))
+		self.assertEqual(True, g.union(2, 3))
+		self.assertEqual(False, g.union(1, 0))
+		self.assertNotEqual(g.find(0), g.find(3))
+		self.assertEqual(True, g.union(1, 3))
+		self.assertEqual(g.find(0), g.find(2))
+
+	def testGrowingTreeAlwaysTakingTheNewestIsABacktracker(self):
+		m = Maze(10,10)
+		GrowingTreeGenerator(m, rng=3, newestChance=1).generate()
+		assertPerfectMaze(self, m)
+		deadEnds = len([cell for cell in m.iterCells() if len(cell.getAllAdjacentUnblockedCells()) == 1])
+		self.assert_(deadEnds < 25)		# long winding passages, unlike the 35 or so Prim's would leave
+
+
+	def testGrowingTreeTakingTheNewestHalfTheTimeIsInBetween(self):
+		for seed in range(3):
+			m = Maze(40,40)
+			GrowingTreeGenerator(m, rng=seed, newestChance=0.5).generate()
+			assertPerfectMaze(self, m)
+			deadEnds = len([cell for cell in m.iterCells() if len(cell.getAllAdjacentUnblockedCells()) == 1])
+			self.assert_(180 < deadEnds < 400, deadEnds)		# always the newest leaves 150-180 here, always a random one 410-470
+
+class RegistryTest(unittest.TestCase):
+	def testGeneratorsByName(self):
+		self.assertEqual(HuntAndKillGenerator, generatorNamed('huntandkill'))
+		self.assertEqual(KruskalsGenerator, generatorNamed('kruskals'))
+		self.assertEqual(EllersGenerator, generatorNamed('ellers'))
+		self.assertRaises(ValueError, generatorNamed, 'nosuchthing')
+
+	def testRegisterGenerator(self):
+		registerGenerator('test', RecursiveBacktrackerGenerator)
+		try:
+			self.assertEqual(RecursiveBacktrackerGenerator, generatorNamed('test'))
+		finally:
+			del generators['test']
+
+
+def assertPerfectMaze(test, maze):
+	"""every cell is reachable from the start, passages are symmetric, and there are exactly cells - 1 of them (so no loops)"""
+	seen = set([maze.startCell])
+	frontier = [maze.startCell]
+	passageEnds = 0
+	while frontier:
+		cell = frontier.pop()
+		for direction in directions:
+			if cell.walls[direction] not in blocked:
+				passageEnds += 1
+				neighbour = cell.getAdjacentCell(direction)
+				test.assertEqual(passage, neighbour.walls[Maze.reverseOf(direction)])
+				if neighbour not in seen:
+					seen.add(neighbour)
+					frontier.append(neighbour)
+	test.assertEqual(maze.height * maze.width, len(seen))
+	test.assertEqual(maze.height * maze.width - 1, passageEnds / 2)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,192 @@
+
+import heapq
+from array import array
+from maze import *
+from mazesolver import passableWalls, passageSteps, endsOf
+
+# A maze boiled down to its decision points. The nodes are the junctions and dead ends - any cell
+# that doesn't have exactly two passages - and the edges are the corridors between them: runs of
+# two-passage cells (the ones Cell.isInPassageway is True for) where there's nothing to decide.
+# Auto-moving through a corridor, or searching across one, then takes a single lookup instead of
+# a step per cell.
+#
+# The index is built lazily, in one pass over the maze, and rebuilt the next time it's used after
+# the maze's walls change (see Maze.changeCount).
+
+class Corridor(object):
+	def __init__(self, startNode, endNode, cells):
+		self.startNode = startNode
+		self.endNode = endNode
+		self.cells = cells			# ordinals of the cells strictly between the two nodes, from startNode's end
+
+	def length(self):
+		"""the number of moves from one end to the other"""
+		return len(self.cells) + 1
+
+	def __repr__(self):
+		return '<Corridor from %s to %s through %s cells>' % (self.startNode, self.endNode, len(self.cells))
+
+class CorridorGraph(object):
+	def __init__(self, maze):
+		self.maze = maze
+		self.builtAt = None
+
+	def refresh(self):
+		"""builds the index if it's never been built or the maze has changed since"""
+		if self.builtAt != self.maze.changeCount:
+			self.build()
+
+	def build(self):
+		self.builtAt = self.maze.changeCount
+		walls = passableWalls(self.maze)
+		steps = passageSteps(self.maze.width)
+		cellCount = len(walls)
+		self.isNode = bytearray(cellCount)
+		self.corridorOf = array('l', [-1]) * cellCount		# for each corridor cell, which corridor it's in...
+		self.positionInCorridor = array('l', [-1]) * cellCount	# ...and where in that corridor's cells
+		self.corridors = []
+		self.corridorsAtNode = {}
+		nodes = [ordinal for ordinal in xrange(cellCount) if len(steps[walls[ordinal]]) != 2]
+		for ordinal in nodes:
+			self.isNode[ordinal] = 1
+
+		for node in nodes:
+			self.walkCorridorsFrom(node, walls, steps)
+		if len(nodes) + sum([len(corridor.cells) for corridor in self.corridors]) < cellCount:
+			# whatever's left are loops with no junction on them at all - make a node of one cell of each
+			for ordinal in xrange(cellCount):
+				if not self.isNode[ordinal] and self.corridorOf[ordinal] < 0:
+					self.isNode[ordinal] = 1
+					self.walkCorridorsFrom(ordinal, walls, steps)
+
+	def walkCorridorsFrom(self, node, walls, steps):
+		for step in steps[walls[node]]:
+			previous, ordinal = node, node + step
+			if self.isNode[ordinal]:
+				if node <= ordinal:			# two nodes side by side - only record that once
+					self.addCorridor(Corridor(node, ordinal, []))
+				continue
+			if self.corridorOf[ordinal] >= 0:
+				continue					# already walked from its other end
+			corridorIndex = len(self.corridors)
+			cells = []
+			while not self.isNode[ordinal]:
+				self.corridorOf[ordinal] = corridorIndex
+				self.positionInCorridor[ordinal] = len(cells)
+				cells.append(ordinal)
+				first, second = steps[walls[ordinal]]
+				previous, ordinal = ordinal, (ordinal + first if ordinal + first != previous else ordinal + second)
+			self.addCorridor(Corridor(node, ordinal, cells))
+
+	def addCorridor(self, corridor):
+		self.corridors.append(corridor)
+		self.corridorsAtNode.setdefault(corridor.startNode, []).append(corridor)
+		if corridor.endNode != corridor.startNode:
+			self.corridorsAtNode.setdefault(corridor.endNode, []).append(corridor)
+
+	def nodeCount(self):
+		self.refresh()
+		return self.isNode.count('\x01')
+
+	def iterNodes(self):
+		self.refresh()
+		for ordinal in xrange(len(self.isNode)):
+			if self.isNode[ordinal]: yield ordinal
+
+	def corridorAhead(self, fromOrdinal, intoOrdinal):
+		"""Returns the ordinals you'd pass through after stepping from 'fromOrdinal' into its neighbour 'intoOrdinal' and carrying on down the corridor, up to and including the junction or dead end at its far end. That's [] if 'intoOrdinal' is already a junction or dead end."""
+		self.refresh()
+		if self.isNode[intoOrdinal]:
+			return []
+		corridor = self.corridors[self.corridorOf[intoOrdinal]]
+		position = self.positionInCorridor[intoOrdinal]
+		if position > 0:
+			forwards = (corridor.cells[position - 1] == fromOrdinal)
+		else:
+			forwards = (corridor.startNode == fromOrdinal)
+		if forwards:
+			return corridor.cells[position + 1:] + [corridor.endNode]
+		behind = corridor.cells[position - 1::-1] if position > 0 else []
+		return behind + [corridor.startNode]
+
+	def solve(self, start=None, finish=None):
+		"""Returns the shortest path between two ordinals (by default the maze's start and finish) like the solvers in mazesolver do, but searching from junction to junction with Dijkstra's algorithm, so each corridor costs one step however long it is."""
+		self.refresh()
+		start, finish = endsOf(self.maze, start, finish)
+		if start == finish:
+			return [start]
+		best = None
+		if not self.isNode[start] and self.corridorOf[start] == self.corridorOf[finish]:
+			# both in the same corridor - going straight along it is one option
+			corridor = self.corridors[self.corridorOf[start]]
+			i, j = self.positionInCorridor[start], self.positionInCorridor[finish]
+			best = (abs(i - j), corridor.cells[i:j + 1] if i <= j else corridor.cells[j:i + 1][::-1])
+
+		# the nodes the search can start from and finish at, with the moves to or from them and the cells on the way
+		starts = self.waysOut(start)
+		if self.isNode[finish]:
+			finishes = {finish: (0, [])}
+		else:
+			finishes = {}
+			for node, moves, cells in self.waysOut(finish):
+				if node not in finishes or moves < finishes[node][0]:		# a loop corridor has both ways out at the same node
+					finishes[node] = (moves, cells[::-1] + [finish])
+
+		distance = {}
+		cameFrom = {}		# node -> (previous node, cells between them), None for the starting nodes
+		heap = []
+		for node, moves, cells in starts:
+			if node not in distance or moves < distance[node]:
+				distance[node] = moves
+				cameFrom[node] = (None, cells)
+				heapq.heappush(heap, (moves, node))
+		settled = set()
+		while heap:
+			moves, node = heapq.heappop(heap)
+			if node in settled:
+				continue
+			if best != None and moves >= best[0]:
+				break
+			settled.add(node)
+			if node in finishes:
+				finishMoves, finishCells = finishes[node]
+				if best == None or moves + finishMoves < best[0]:
+					best = (moves + finishMoves, self.pathTo(node, cameFrom, start) + finishCells)
+			for corridor in self.corridorsAtNode.get(node, []):
+				if corridor.startNode == node:
+					neighbour, cells = corridor.endNode, corridor.cells
+				else:
+					neighbour, cells = corridor.startNode, corridor.cells[::-1]
+				neighbourMoves = moves + corridor.length()
+				if neighbour not in settled and (neighbour not in distance or neighbourMoves < distance[neighbour]):
+					distance[neighbour] = neighbourMoves
+					cameFrom[neighbour] = (node, cells)
+					heapq.heappush(heap, (neighbourMoves, neighbour))
+		if best == None:
+			return None
+		return best[1]
+
+	def waysOut(self, ordinal):
+		"""returns (node, moves, cells passed on the way) for each node you can walk straight to from 'ordinal' - just itself if it's a node"""
+		if self.isNode[ordinal]:
+			return [(ordinal, 0, [])]
+		corridor = self.corridors[self.corridorOf[ordinal]]
+		position = self.positionInCorridor[ordinal]
+		backwards = corridor.cells[position - 1::-1] if position > 0 else []
+		forwards = corridor.cells[position + 1:]
+		return [(corridor.startNode, position + 1, backwards), (corridor.endNode, len(corridor.cells) - position, forwards)]
+
+	def pathTo(self, node, cameFrom, start):
+		"""the cells from 'start' up to and including 'node', following cameFrom back"""
+		path = [node]
+		while True:
+			previous, cells = cameFrom[node]
+			path.extend(reversed(cells))
+			if previous == None:
+				break
+			path.append(previous)
+			node = previous
+		path.reverse()
+		if path[0] != start:
+			path.insert(0, start)		# start was in a corridor, rather than a node itself
+		return path
@@ -0,0 +1,106 @@
+
+import random
+import unittest
+from mazegraph import *
+from mazesolver import solveBFS
+from mazetest import getFinishedTestMaze
+
+
+class CorridorGraphTest(unittest.TestCase):
+	def setUp(self):
+		# the test maze, with its ordinals:
+		#  _______          0  1  2  3
+		# |__ ___ |         4  5  6  7
+		# |__ __| |         8  9 10 11
+		# |___|___|
+		self.graph = CorridorGraph(getFinishedTestMaze())
+		self.graph.refresh()
+
+	def testNodesAreJunctionsAndDeadEnds(self):
+		self.assertEqual([0, 1, 4, 5, 6, 8, 10], list(self.graph.iterNodes()))
+		self.assertEqual(7, self.graph.nodeCount())
+
+	def testCorridors(self):
+		corridors = dict([((c.startNode, c.endNode), c.cells) for c in self.graph.corridors])
+		self.assertEqual([2, 3, 7, 11], corridors[(1, 10)])
+		self.assertEqual([9], corridors[(5, 8)])
+		self.assertEqual([], corridors[(0, 1)])
+		self.assertEqual([], corridors[(1, 5)])
+		self.assertEqual(6, len(corridors))		# 7 nodes in a perfect maze are joined by 6 corridors
+		self.assertEqual(5, self.graph.corridors[self.graph.corridorOf[7]].length())
+
+	def testCorridorAhead(self):
+		self.assertEqual([3, 7, 11, 10], self.graph.corridorAhead(1, 2))
+		self.assertEqual([7, 11, 10], self.graph.corridorAhead(2, 3))
+		self.assertEqual([2, 1], self.graph.corridorAhead(7, 3))
+		self.assertEqual([1], self.graph.corridorAhead(3, 2))
+		self.assertEqual([7, 3, 2, 1], self.graph.corridorAhead(10, 11))
+		self.assertEqual([5], self.graph.corridorAhead(8, 9))
+		self.assertEqual([], self.graph.corridorAhead(0, 1))
+
+	def testSolveMatchesBFS(self):
+		m = self.graph.maze
+		self.assertEqual(solveBFS(m), self.graph.solve())
+		for start in range(12):
+			for finish in range(12):
+				self.assertEqual(solveBFS(m, start, finish), self.graph.solve(start, finish))
+
+	def testSolveMatchesBFSOnGeneratedMazes(self):
+		rng = random.Random(4)
+		for seed in range(3):
+			m = Maze(12,15)
+			HuntAndKillGenerator(m, rng=seed).generate()
+			graph = CorridorGraph(m)
+			self.assertEqual(solveBFS(m), graph.solve())
+			for i in range(30):
+				start, finish = rng.randrange(180), rng.randrange(180)
+				self.assertEqual(solveBFS(m, start, finish), graph.solve(start, finish))
+
+	def testSolveMazeWithLoops(self):
+		m = Maze(3,3)
+		for row in m.cells:
+			for cell in row:
+				if cell.col < 2: cell.openPassageInDirection(east)
+				if cell.row < 2: cell.openPassageInDirection(south)
+		graph = CorridorGraph(m)
+		for start in range(9):
+			for finish in range(9):
+				self.assertEqual(len(solveBFS(m, start, finish)), len(graph.solve(start, finish)))
+
+	def testFinishInALoopFromAJunctionBackToItself(self):
+		m = CompactMaze(3,3)
+		for row, col, direction in [(0,0,east), (0,1,east), (0,2,south), (1,2,west), (1,1,west), (1,0,north), (1,0,south)]:
+			m.cells[row][col].openPassageInDirection(direction)
+		graph = CorridorGraph(m)
+		self.assertEqual([6, 3, 0, 1], solveBFS(m, 6, 1))
+		self.assertEqual([6, 3, 0, 1], graph.solve(6, 1))
+		for finish in range(7):		# the bottom right two cells aren't joined on
+			self.assertEqual(len(solveBFS(m, 6, finish)), len(graph.solve(6, finish)))
+
+	def testLoopWithNoJunctions(self):
+		m = Maze(2,2)
+		m.cells[0][0].openPassageInDirection(east)
+		m.cells[0][1].openPassageInDirection(south)
+		m.cells[1][1].openPassageInDirection(west)
+		m.cells[1][0].openPassageInDirection(north)
+		graph = CorridorGraph(m)
+		self.assertEqual(1, graph.nodeCount())
+		self.assertEqual(3, len(graph.solve()))
+		self.assertEqual([2, 3], graph.solve(2, 3))
+		self.assertEqual(3, len(graph.solve(1, 2)))		# either way round the loop
+
+	def testNoWayThrough(self):
+		self.assertEqual(None, CorridorGraph(Maze(2,2)).solve())
+
+	def testRebuildsWhenPassagesAreOpened(self):
+		m = Maze(1,3)
+		graph = CorridorGraph(m)
+		self.assertEqual(3, graph.nodeCount())
+		m.cells[0][0].openPassageInDirection(east)
+		m.cells[0][1].openPassageInDirection(east)
+		self.assertEqual(2, graph.nodeCount())
+		self.assertEqual([2], graph.corridorAhead(0, 1))
+
+
+if __name__ == '__main__':
+	unittest.main()
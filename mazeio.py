@@ -0,0 +1,210 @@
+
+import mmap
+import struct
+from maze import *
+from mazegenerators import flagsToLanes, lanesToFlags, packRow
+
+# A compact binary file format for mazes. The file starts with a fixed-size header:
+#
+#   magic 'MAZE', format version, header size, then height, width, start row, start col,
+#   finish row and finish col - all little endian, the last six as unsigned 32-bit ints
+#
+# followed by two bits per cell in ordinal order, four cells to a byte starting from the low
+# bits: the first bit is set if the cell's east wall is a passage, the second if its south wall
+# is. The other walls follow from those - a cell's west wall is its left neighbour's east wall,
+# and its north wall is the south wall of the cell above - and the edges of the maze are
+# restored the way every new Maze sets them up, so a generated maze round-trips exactly.
+# (Permanent walls anywhere else, or passages opened on only one side, aren't kept.)
+
+MAGIC = 'MAZE'
+VERSION = 1
+header = struct.Struct('<4sHH6I')
+
+# for each packed wall byte, its two bits in the file: 1 if east is a passage, 2 if south is
+eastSouthCode = ''.join([chr((unpackWall(packed, east) == passage) | ((unpackWall(packed, south) == passage) << 1)) for packed in range(256)])
+# and for each file byte, the code of the cell in each of its four positions
+codeAtPosition = [''.join([chr((fileByte >> (2 * position)) & 3) for fileByte in range(256)]) for position in range(4)]
+eastOfCode  = ''.join([chr(code & 1) for code in range(256)])
+southOfCode = ''.join([chr((code >> 1) & 1) for code in range(256)])
+
+
+def toBytes(maze):
+	"""returns the maze in the binary format, as a string"""
+	cellCount = maze.height * maze.width
+	codes = maze.packedWalls().translate(eastSouthCode)
+	codes += bytearray(-cellCount % 4)		# pad to a whole number of bytes
+	s = header.pack(MAGIC, VERSION, header.size, maze.height, maze.width,
+					maze.startCell.row, maze.startCell.col, maze.finishCell.row, maze.finishCell.col)
+	return s + packCodes(codes)
+
+def packCodes(codes):
+	"""returns the file bytes for a bytearray of cell codes (see eastSouthCode), which must be a multiple of four long"""
+	# each code fits in two bits, so four cells' worth of bytes can be shifted into one byte -
+	# as lane ints (see mazegenerators) that's a few big-int operations for the whole lot
+	if not codes:
+		return ''
+	bits = 0
+	for position in range(4):
+		bits |= flagsToLanes(codes[position::4]) << (2 * position)
+	return str(lanesToFlags(bits, len(codes) // 4))
+
+def fromBytes(data):
+	"""returns a CompactMaze from a string (or buffer) in the binary format"""
+	height, width, (startRow, startCol), (finishRow, finishCol), offset = readHeader(data)
+	cellCount = height * width
+	byteCount = (cellCount + 3) // 4
+	fileBytes = bytearray(data[offset:offset + byteCount])
+	if len(fileBytes) != byteCount:
+		raise ValueError('expected %s bytes of walls, got %s' % (byteCount, len(fileBytes)))
+	codes = bytearray(byteCount * 4)
+	for position in range(4):
+		codes[position::4] = fileBytes.translate(codeAtPosition[position])
+
+	maze = CompactMaze(height, width)
+	southAbove = 0
+	for rowStart in range(0, cellCount, width):
+		rowCodes = codes[rowStart:rowStart + width]
+		eastLanes = flagsToLanes(rowCodes.translate(eastOfCode))
+		southLanes = flagsToLanes(rowCodes.translate(southOfCode))
+		maze.wallBytes[rowStart:rowStart + width] = packRow(eastLanes, southLanes, southAbove, width)
+		southAbove = southLanes
+	maze.setEdgesToPermanentWalls()
+	maze.startCell = maze.cells[startRow][startCol]
+	maze.finishCell = maze.cells[finishRow][finishCol]
+	return maze
+
+def readHeader(data):
+	"""returns (height, width, (start row, start col), (finish row, finish col), offset of the wall bits) from the start of a maze in the binary format"""
+	if len(data) < header.size:
+		raise ValueError('too short to be a maze: %s bytes' % len(data))
+	magic, version, size, height, width, startRow, startCol, finishRow, finishCol = header.unpack(str(data[:header.size]))
+	if magic != MAGIC:
+		raise ValueError('not a maze: starts with %r' % magic)
+	if version != VERSION:
+		raise ValueError('unsupported maze format version %s' % version)
+	return height, width, (startRow, startCol), (finishRow, finishCol), size
+
+def save(maze, fileOrPath):
+	"""writes the maze in the binary format to a path or an open (binary) file"""
+	if hasattr(fileOrPath, 'write'):
+		fileOrPath.write(toBytes(maze))
+	else:
+		f = open(fileOrPath, 'wb')
+		try:
+			f.write(toBytes(maze))
+		finally:
+			f.close()
+
+def load(fileOrPath):
+	"""reads a maze in the binary format from a path or an open (binary) file, and returns it as a CompactMaze"""
+	if hasattr(fileOrPath, 'read'):
+		return fromBytes(fileOrPath.read())
+	f = open(fileOrPath, 'rb')
+	try:
+		return fromBytes(f.read())
+	finally:
+		f.close()
+
+
+class MazeWriter(object):
+	"""Writes a maze in the binary format a row at a time, for mazes that are made a row at a time and never held in memory whole (see mazestream). Give writeRow the (east, south) lane ints for each row, top to bottom, as a RowGenerator's iterRows yields them, then call close."""
+	def __init__(self, fileOrPath, height, width, start=(0, 0), finish=None):
+		if finish == None:
+			finish = (height - 1, width - 1)
+		if hasattr(fileOrPath, 'write'):
+			self.file, self.ownsFile = fileOrPath, False
+		else:
+			self.file, self.ownsFile = open(fileOrPath, 'wb'), True
+		self.height, self.width = height, width
+		self.rowsWritten = 0
+		self.leftOver = bytearray()		# codes for the cells at the end of the last row that didn't fill a byte
+		self.file.write(header.pack(MAGIC, VERSION, header.size, height, width, start[0], start[1], finish[0], finish[1]))
+
+	def writeRow(self, east, south):
+		if self.rowsWritten == self.height:
+			raise ValueError('all %s rows have already been written' % self.height)
+		codes = self.leftOver + lanesToFlags(east | (south << 1), self.width)
+		whole = len(codes) - len(codes) % 4
+		self.file.write(packCodes(codes[:whole]))
+		self.leftOver = codes[whole:]
+		self.rowsWritten += 1
+
+	def close(self):
+		"""writes out the last few cells and closes the file if it was opened from a path"""
+		if self.rowsWritten != self.height:
+			raise ValueError('only %s of %s rows were written' % (self.rowsWritten, self.height))
+		if self.leftOver:
+			self.file.write(packCodes(self.leftOver + bytearray(-len(self.leftOver) % 4)))
+			self.leftOver = bytearray()
+		if self.ownsFile:
+			self.file.close()
+
+
+class MappedMaze(Maze):
+	"""A read-only maze backed by a memory-mapped file in the binary format. Cells and their walls are read from the file as they're asked for (see CompactCell), so opening one costs the same no matter how big the maze is, and only the pages you touch are read."""
+	def __init__(self, path):
+		f = open(path, 'rb')
+		try:
+			self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		finally:
+			f.close()
+		self.height, self.width, (startRow, startCol), (finishRow, finishCol), self.offset = readHeader(self.map)
+		if len(self.map) < self.offset + (self.height * self.width + 3) // 4:
+			raise ValueError('%s is truncated' % path)
+		self.cells = CompactRows(self)
+		self.startCell = self.cells[startRow][startCol]
+		self.finishCell = self.cells[finishRow][finishCol]
+
+	def close(self):
+		self.map.close()
+
+	neighbourOrdinal = calculateNeighbourOrdinal
+
+	def wallsForOrdinal(self, ordinal):
+		return MappedWalls(self, ordinal)
+
+	def isPassage(self, ordinal, direction):
+		"""returns True if the cell with 'ordinal' has a passage in 'direction', straight from the file"""
+		if direction == north:
+			if ordinal < self.width: return False
+			ordinal, direction = ordinal - self.width, south
+		elif direction == west:
+			if ordinal % self.width == 0: return False
+			ordinal, direction = ordinal - 1, east
+		code = ord(self.map[self.offset + (ordinal >> 2)]) >> (2 * (ordinal & 3))
+		if direction == east:
+			return bool(code & 1)
+		else:
+			return bool(code & 2)
+
+	def packedWalls(self):
+		"""returns every cell's walls as a bytearray (see CompactMaze) - this reads the whole file, but still doesn't create any Cells"""
+		return fromBytes(self.map).wallBytes
+
+class MappedWalls(object):
+	"""Stands in for Cell.walls in a MappedMaze."""
+	def __init__(self, maze, ordinal):
+		self.maze = maze
+		self.ordinal = ordinal
+
+	def __len__(self):
+		return 4
+
+	def __getitem__(self, direction):
+		if self.maze.isPassage(self.ordinal, direction):
+			return passage
+		row, col = self.maze.ordinalToCellPosition(self.ordinal)
+		if self.maze.neighbourOrdinal(self.ordinal, direction) == noNeighbour:
+			# the edge of the maze, which is left the way setEdgesToPermanentWalls leaves a new maze
+			if row in [0, self.maze.height - 1] and col in [0, self.maze.width - 1]:
+				return permanentwall
+		return wall
+
+	def __setitem__(self, direction, value):
+		raise TypeError('a MappedMaze is read-only - load() it to get a maze you can change')
+
+	def __iter__(self):
+		return iter([self[direction] for direction in range(4)])
+
+	def __repr__(self):
+		return repr(list(self))
@@ -0,0 +1,92 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+import StringIO
+from mazeio import *
+
+
+class MazeIOTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, 'test.maze')
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def testRoundTripKeepsEveryWall(self):
+		for height, width in [(1,1), (1,3), (3,4), (5,7), (12,9)]:
+			m = Maze(height, width)
+			HuntAndKillGenerator(m, rng=height * width).generate()
+			loaded = fromBytes(toBytes(m))
+			self.assertEqual((height, width), (loaded.height, loaded.width))
+			self.assertEqual(m.packedWalls(), loaded.packedWalls())
+			self.assertEqual(str(m), str(loaded))
+
+	def testUsesTwoBitsPerCell(self):
+		m = Maze(10,10)
+		self.assertEqual(header.size + 25, len(toBytes(m)))
+		m = Maze(3,3)
+		self.assertEqual(header.size + 3, len(toBytes(m)))
+
+	def testKeepsStartAndFinish(self):
+		m = CompactMaze(4,5)
+		m.startCell = m.cells[1][2]
+		m.finishCell = m.cells[3][0]
+		loaded = fromBytes(toBytes(m))
+		self.assertEqual((1,2), (loaded.startCell.row, loaded.startCell.col))
+		self.assertEqual((3,0), (loaded.finishCell.row, loaded.finishCell.col))
+
+	def testSaveAndLoad(self):
+		m = Maze(6,7)
+		HuntAndKillGenerator(m, rng=1).generate()
+		save(m, self.path)
+		self.assertEqual(str(m), str(load(self.path)))
+		stream = StringIO.StringIO()
+		save(m, stream)
+		stream.seek(0)
+		self.assertEqual(str(m), str(load(stream)))
+
+	def testRejectsOtherData(self):
+		self.assertRaises(ValueError, fromBytes, 'MAZ')
+		self.assertRaises(ValueError, fromBytes, 'ZAME' + toBytes(Maze(2,2))[4:])
+		self.assertRaises(ValueError, fromBytes, toBytes(Maze(5,5))[:-1])
+
+
+class MappedMazeTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, 'test.maze')
+		self.maze = Maze(7,9)
+		HuntAndKillGenerator(self.maze, rng=3).generate()
+		self.maze.finishCell = self.maze.cells[6][4]
+		save(self.maze, self.path)
+		self.mapped = MappedMaze(self.path)
+
+	def tearDown(self):
+		self.mapped.close()
+		shutil.rmtree(self.directory)
+
+	def testWallsMatchTheSavedMaze(self):
+		for row in range(7):
+			for col in range(9):
+				self.assertEqual(self.maze.cells[row][col].walls, list(self.mapped.cells[row][col].walls))
+		self.assertEqual(str(self.maze), str(self.mapped))
+		self.assertEqual(self.maze.packedWalls(), self.mapped.packedWalls())
+
+	def testStartAndFinish(self):
+		self.assertEqual(self.mapped.cells[0][0], self.mapped.startCell)
+		self.assertEqual(self.mapped.cells[6][4], self.mapped.finishCell)
+
+	def testCellAPIWorks(self):
+		cell = self.mapped.cells[3][3]
+		expected = [(c.row, c.col) for c in self.maze.cells[3][3].getAllAdjacentUnblockedCells()]
+		self.assertEqual(expected, [(c.row, c.col) for c in cell.getAllAdjacentUnblockedCells()])
+
+	def testIsReadOnly(self):
+		self.assertRaises(TypeError, self.mapped.cells[1][1].openPassageInDirection, east)
+
+
+if __name__ == '__main__':
+	unittest.main()
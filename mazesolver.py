@@ -0,0 +1,137 @@
+
+import heapq
+from array import array
+from maze import *
+
+# Solvers that work on cell ordinals and the maze's packed walls (see CompactMaze) instead of on
+# Cells, keeping their bookkeeping in flat arrays indexed by ordinal. Each returns the path as a
+# list of ordinals from start to finish, both included, or None if there's no way through. The
+# start and finish default to the maze's startCell and finishCell; use pathToCells if you want
+# Cells back.
+
+# the bit of a packed wall byte that's set when the wall in each direction is a passage
+passageBits = [passage << (2 * direction) for direction in range(4)]
+
+# translates a packed wall byte to the number of passages out of the cell
+passageCounts = ''.join([chr(len([bit for bit in passageBits if packed & bit])) for packed in range(256)])
+
+def passableWalls(maze):
+	"""Returns a copy of the maze's packed walls with any passage that would lead off the edge closed, so the solvers can follow passages without checking bounds."""
+	walls = bytearray(maze.packedWalls())
+	height, width = maze.height, maze.width
+	for col in range(width):
+		walls[col] &= ~passageBits[north]
+		walls[(height - 1) * width + col] &= ~passageBits[south]
+	for row in range(height):
+		walls[row * width] &= ~passageBits[west]
+		walls[row * width + width - 1] &= ~passageBits[east]
+	return walls
+
+def passageSteps(width):
+	"""Returns a table giving, for each packed wall byte, the ordinal offsets to the neighbours its passages lead to."""
+	offsets = [(passageBits[north], -width), (passageBits[east], 1), (passageBits[south], width), (passageBits[west], -1)]
+	return [tuple([offset for bit, offset in offsets if packed & bit]) for packed in range(256)]
+
+def endsOf(maze, start, finish):
+	if start == None: start = maze.startCell.ordinal()
+	if finish == None: finish = maze.finishCell.ordinal()
+	return start, finish
+
+def tracePath(parent, start, finish):
+	"""returns the ordinals from 'start' to 'finish' by following 'parent' back from 'finish'"""
+	path = [finish]
+	while path[-1] != start:
+		path.append(parent[path[-1]])
+	path.reverse()
+	return path
+
+def pathToCells(maze, path):
+	return [maze.ordinalToCell(ordinal) for ordinal in path]
+
+
+def solveBFS(maze, start=None, finish=None):
+	"""Breadth-first search, which finds a shortest path."""
+	start, finish = endsOf(maze, start, finish)
+	walls = passableWalls(maze)
+	steps = passageSteps(maze.width)
+	parent = array('l', [-1]) * len(walls)
+	parent[start] = start
+	queue = array('l', [start])
+	enqueue = queue.append
+	for ordinal in queue:		# iterating an array picks up what's appended along the way, so this is the queue's front
+		if ordinal == finish:
+			return tracePath(parent, start, finish)
+		for step in steps[walls[ordinal]]:
+			neighbour = ordinal + step
+			if parent[neighbour] < 0:
+				parent[neighbour] = ordinal
+				enqueue(neighbour)
+	return None
+
+def solveBidirectionalBFS(maze, start=None, finish=None):
+	"""Breadth-first search from both ends at once, a level at a time from whichever side has the smaller frontier, stopping when they meet. Also finds a shortest path, usually after visiting far fewer cells than solveBFS."""
+	start, finish = endsOf(maze, start, finish)
+	if start == finish:
+		return [start]
+	walls = passableWalls(maze)
+	steps = passageSteps(maze.width)
+	# parents found searching from the start, and from the finish - the finish side's "parents" point back towards the finish
+	fromStart = array('l', [-1]) * len(walls)
+	fromFinish = array('l', [-1]) * len(walls)
+	fromStart[start] = start
+	fromFinish[finish] = finish
+	startFrontier, finishFrontier = [start], [finish]
+	while startFrontier and finishFrontier:
+		if len(startFrontier) <= len(finishFrontier):
+			startFrontier, meeting = expandLevel(startFrontier, fromStart, fromFinish, walls, steps)
+		else:
+			finishFrontier, meeting = expandLevel(finishFrontier, fromFinish, fromStart, walls, steps)
+		if meeting != None:
+			path = tracePath(fromStart, start, meeting)
+			ordinal = meeting
+			while ordinal != finish:
+				ordinal = fromFinish[ordinal]
+				path.append(ordinal)
+			return path
+	return None
+
+def expandLevel(frontier, parent, otherParent, walls, steps):
+	"""Visits the neighbours of every cell in 'frontier' for one side of solveBidirectionalBFS. Returns the new frontier and the cell where the two sides met, or None if they haven't yet."""
+	nextFrontier = []
+	addToFrontier = nextFrontier.append
+	for ordinal in frontier:
+		for step in steps[walls[ordinal]]:
+			neighbour = ordinal + step
+			if parent[neighbour] < 0:
+				parent[neighbour] = ordinal
+				if otherParent[neighbour] >= 0:
+					return nextFrontier, neighbour
+				addToFrontier(neighbour)
+	return nextFrontier, None
+
+def solveAStar(maze, start=None, finish=None):
+	"""A* search with the Manhattan distance to the finish as its heuristic, which never overestimates on a grid, so this finds a shortest path too."""
+	start, finish = endsOf(maze, start, finish)
+	walls = passableWalls(maze)
+	steps = passageSteps(maze.width)
+	width = maze.width
+	finishRow, finishCol = divmod(finish, width)
+	parent = array('l', [-1]) * len(walls)
+	distance = array('l', [-1]) * len(walls)	# from the start, once a cell's been reached
+	parent[start] = start
+	distance[start] = 0
+	startRow, startCol = divmod(start, width)
+	heap = [(abs(startRow - finishRow) + abs(startCol - finishCol), start)]
+	while heap:
+		estimate, ordinal = heapq.heappop(heap)
+		if ordinal == finish:
+			return tracePath(parent, start, finish)
+		neighbourDistance = distance[ordinal] + 1
+		for step in steps[walls[ordinal]]:
+			neighbour = ordinal + step
+			if distance[neighbour] < 0 or neighbourDistance < distance[neighbour]:
+				parent[neighbour] = ordinal
+				distance[neighbour] = neighbourDistance
+				row, col = divmod(neighbour, width)
+				heapq.heappush(heap, (neighbourDistance + abs(row - finishRow) + abs(col - finishCol), neighbour))
+	return None
@@ -0,0 +1,70 @@
+
+import unittest
+from mazesolver import *
+from mazegenerators import EllersGenerator
+from mazetest import getFinishedTestMaze
+
+solvers = [solveBFS, solveBidirectionalBFS, solveAStar]
+
+
+class MazeSolverTest(unittest.TestCase):
+	def testSolveSmallMaze(self):
+		# maze looks like this (the same one as in mazetest):
+		#  _______
+		# |__ ___ |
+		# |__ __| |
+		# |___|___|
+		m = getFinishedTestMaze()
+		for solve in solvers:
+			self.assertEqual([0, 1, 2, 3, 7, 11], solve(m))
+			self.assertEqual([8, 9, 5, 1, 2, 3, 7, 11], solve(m, start=8))
+			self.assertEqual([4, 5, 6], solve(m, start=4, finish=6))
+
+	def testSolveToTheSameCell(self):
+		m = getFinishedTestMaze()
+		for solve in solvers:
+			self.assertEqual([5], solve(m, start=5, finish=5))
+
+	def testNoWayThrough(self):
+		m = Maze(3,3)
+		m.cells[0][0].openPassageInDirection(east)
+		for solve in solvers:
+			self.assertEqual(None, solve(m))
+
+	def testSolversAgreeOnGeneratedMazes(self):
+		for seed in range(5):
+			m = Maze(15,20)
+			HuntAndKillGenerator(m, rng=seed).generate()
+			path = solveBFS(m)
+			assertPathFollowsPassages(self, m, path)
+			self.assertEqual(path, solveBidirectionalBFS(m))	# a perfect maze has only one path
+			self.assertEqual(path, solveAStar(m))
+
+	def testSolveCompactMaze(self):
+		m = CompactMaze(30,40)
+		EllersGenerator(m, rng=1).generate()
+		path = solveBidirectionalBFS(m)
+		assertPathFollowsPassages(self, m, path)
+		self.assertEqual(m.startCell, pathToCells(m, path)[0])
+		self.assertEqual(m.finishCell, pathToCells(m, path)[-1])
+
+	def testPassagesOffTheEdgeAreIgnored(self):
+		m = Maze(2,2)
+		m.cells[0][0].walls[north] = passage
+		m.cells[0][1].walls[east] = passage
+		walls = passableWalls(m)
+		self.assertEqual(m.packedWalls()[2:], walls[2:])
+		self.assertEqual(0, walls[0] & passageBits[north])
+		self.assertEqual(0, walls[1] & passageBits[east])
+
+
+def assertPathFollowsPassages(test, maze, path):
+	test.assertEqual(maze.startCell.ordinal(), path[0])
+	test.assertEqual(maze.finishCell.ordinal(), path[-1])
+	for ordinal, nextOrdinal in zip(path, path[1:]):
+		cell, nextCell = maze.ordinalToCell(ordinal), maze.ordinalToCell(nextOrdinal)
+		test.assert_(nextCell in cell.getAllAdjacentUnblockedCells())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,34 @@
+
+from maze import *
+from mazegenerators import EllersGenerator, packRow
+from mazeio import MazeWriter
+
+# Generates mazes too big to hold in memory, a row at a time, writing each row out as it's made
+# and then forgetting it. A row generator (see mazegenerators) only needs its own row of state -
+# Eller's keeps one set label per column - so memory depends on the width of the maze and not on
+# its height: a maze a few tens of thousands of cells wide can be as tall as you like.
+
+class MazeShape(object):
+	"""Stands in for the maze a row generator would write into, when its rows are streamed out instead - iterRows only needs the size."""
+	def __init__(self, height, width):
+		self.height = height
+		self.width = width
+
+def iterRowLanes(height, width, generatorClass=EllersGenerator, rng=None):
+	"""Yields an (east, south) pair of lane ints for each row of a new 'height' by 'width' maze, from the top. 'generatorClass' is any RowGenerator; with the same 'rng' seed, the rows are the ones it'd write into a CompactMaze."""
+	return generatorClass(MazeShape(height, width), rng=rng).iterRows()
+
+def streamToFile(height, width, fileOrPath, generatorClass=EllersGenerator, rng=None):
+	"""writes a new maze to a path or an open (binary) file in mazeio's binary format, without ever holding more than a row of it"""
+	writer = MazeWriter(fileOrPath, height, width)
+	for east, south in iterRowLanes(height, width, generatorClass, rng):
+		writer.writeRow(east, south)
+	writer.close()
+
+def streamAscii(height, width, stream, generatorClass=EllersGenerator, rng=None):
+	"""writes the ASCII art for a new maze to the file-like 'stream' a line at a time, like Maze.writeAscii, without ever holding more than a row of it"""
+	stream.write(' ' + '_'*((width * 2) - 1) + ' \n')
+	southAbove = 0
+	for east, south in iterRowLanes(height, width, generatorClass, rng):
+		stream.write(asciiLineForPackedRow(packRow(east, south, southAbove, width)))
+		southAbove = south
@@ -0,0 +1,53 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+import StringIO
+import mazeio
+from mazestream import *
+from mazegenerators import BinaryTreeGenerator, SidewinderGenerator
+
+
+class MazeStreamTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, 'test.maze')
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def testStreamedFileMatchesGeneratingInMemory(self):
+		for height, width in [(1,1), (1,6), (5,1), (7,9), (12,8), (13,11)]:
+			m = CompactMaze(height, width)
+			EllersGenerator(m, rng=height + width).generate()
+			streamToFile(height, width, self.path, rng=height + width)
+			self.assertEqual(mazeio.toBytes(m), open(self.path, 'rb').read())
+			self.assertEqual(str(m), str(mazeio.load(self.path)))
+
+	def testStreamedAsciiMatchesGeneratingInMemory(self):
+		for generatorClass in [EllersGenerator, BinaryTreeGenerator, SidewinderGenerator]:
+			m = CompactMaze(9,7)
+			generatorClass(m, rng=4).generate()
+			stream = StringIO.StringIO()
+			streamAscii(9, 7, stream, generatorClass, rng=4)
+			self.assertEqual(str(m), stream.getvalue())
+
+	def testStreamToOpenFile(self):
+		stream = StringIO.StringIO()
+		streamToFile(6, 5, stream, rng=1)
+		m = CompactMaze(6,5)
+		EllersGenerator(m, rng=1).generate()
+		self.assertEqual(mazeio.toBytes(m), stream.getvalue())
+
+	def testWriterNeedsEveryRow(self):
+		writer = mazeio.MazeWriter(StringIO.StringIO(), 2, 3)
+		writer.writeRow(0, 0)
+		self.assertRaises(ValueError, writer.close)
+		writer.writeRow(0, 0)
+		self.assertRaises(ValueError, writer.writeRow, 0, 0)
+		writer.close()
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -8,6 +8,9 @@ Copyright (c) 2007 __MyCompanyName__. All rights reserved.
 """
 
 import unittest
+import logging
+import random
+import StringIO
 
 from maze import *
 
@@ -104,6 +107,20 @@ class MazeTest(unittest.TestCase):
 		self.assertEqual(expected, s)
 		
 		
+	def testWriteAsciiMatchesStringRepresentation(self):
+		m = getFinishedTestMaze()
+		stream = StringIO.StringIO()
+		m.writeAscii(stream)
+		self.assertEqual(str(m), stream.getvalue())
+		self.assertEqual(4, len(list(m.iterAsciiLines())))
+		self.assertEqual('|__ ___ |\n', list(m.iterAsciiLines())[1])
+
+	def testStringRepresentationMatchesCells(self):
+		m = Maze(5,6)
+		HuntAndKillGenerator(m).generate()
+		expected = ' ' + '_'*11 + ' \n' + ''.join(['|' + ''.join([str(cell) for cell in row]) + '\n' for row in m.cells])
+		self.assertEqual(expected, str(m))
+		
 	def testDirectionsEnumExists(self):
 		self.assertEqual(0, north)
 		self.assertEqual(1, east)
@@ -155,11 +172,59 @@ class MazeTest(unittest.TestCase):
 		self.assertEqual(m.cells[0][0], m.ordinalToCell(0))
 		self.assertEqual(m.cells[2][3], m.ordinalToCell(11))
 
+	def testBlockedFlags(self):
+		m = getFinishedTestMaze()
+		for direction in range(4):
+			self.assertEqual(bytearray([cell.walls[direction] in blocked for cell in m.iterCells()]), m.blockedFlags(direction))
+			self.assertEqual(bytearray([cell.walls[direction] in blocked for cell in m.iterCells(1, 1, 2, 2)]), m.blockedFlags(direction, 1, 1, 2, 2))
+		self.assertEqual(bytearray([cell.walls[east] in blocked for cell in m.cells[2]]), m.blockedFlags(east, 2, height=1))
+		self.assertEqual(bytearray(), m.blockedFlags(south, 1, 1, 0, 0))
+		self.assertRaises(ValueError, m.blockedFlags, south, 3, 0, 2)
+
+	def testPackedRegionWalls(self):
+		m = getFinishedTestMaze()
+		self.assertEqual(m.packedWalls(), m.packedRegionWalls())
+		self.assertEqual(bytearray([packWalls(cell.walls) for cell in m.iterCells(1, 2, 2, 2)]), m.packedRegionWalls(1, 2, 2, 2))
+
+	def testNeighbourTable(self):
+		m = Maze(3,4)
+		self.assertEqual(None, m.neighbours)
+		table = m.neighbourTable()
+		self.assertEqual(48, len(table))
+		self.assertEqual([noNeighbour, 1, 4, noNeighbour], list(table[0:4]))
+		self.assertEqual([1, 6, 9, 4], list(table[20:24]))
+		self.assertEqual([7, noNeighbour, noNeighbour, 10], list(table[44:48]))
+		self.assert_(m.neighbourTable() is table)
+		self.assertEqual(9, m.neighbourOrdinal(5, south))
+		self.assertEqual(noNeighbour, m.neighbourOrdinal(3, east))
+
+	def testNeighbourTableAlongOneRowOrColumn(self):
+		self.assertEqual([noNeighbour, 1, noNeighbour, noNeighbour, noNeighbour, noNeighbour, noNeighbour, 0], list(Maze(1,2).neighbourTable()))
+		self.assertEqual([noNeighbour, noNeighbour, 1, noNeighbour, 0, noNeighbour, noNeighbour, noNeighbour], list(Maze(2,1).neighbourTable()))
+
 	def testStartAndFinishCells(self):
 		m = Maze(3,4)
 		self.assertEqual(m.cells[0][0], m.startCell)
 		self.assertEqual(m.cells[2][3], m.finishCell)
 
+	def testIterCellsAndOrdinals(self):
+		for m in [Maze(3,4), CompactMaze(3,4)]:
+			self.assertEqual(range(12), [cell.ordinal() for cell in m.iterCells()])
+			self.assertEqual(range(12), list(m.iterOrdinals()))
+		m = Maze(3,4)
+		self.assert_(list(m.iterCells())[-1] is m.cells[2][3])		# the maze's own cells, not copies
+
+	def testIterRegions(self):
+		m = Maze(3,4)
+		self.assertEqual([5, 6, 9, 10], [cell.ordinal() for cell in m.iterCells(1, 1, 2, 2)])
+		self.assertEqual([5, 6, 9, 10], list(m.iterOrdinals(1, 1, 2, 2)))
+		self.assertEqual([4, 5, 6, 7, 8, 9, 10, 11], list(m.iterOrdinals(top=1)))
+		self.assertEqual([3, 7, 11], list(m.iterOrdinals(left=3)))
+		self.assertEqual([], list(m.iterCells(1, 1, 0, 2)))
+		self.assertRaises(ValueError, m.iterCells, 2, 0, 2)
+		self.assertRaises(ValueError, m.iterOrdinals, 0, 3, None, 2)
+		self.assertRaises(ValueError, m.iterOrdinals, -1)
+
 
 class CellTest(unittest.TestCase):
 	def testCreateSimpleCell(self):
@@ -326,6 +391,102 @@ class CellTest(unittest.TestCase):
 		self.assertEqual(m.cells[2][0], m.cells[2][1].getAdjacentPassagewayExitCell(m.cells[1][1]))
 		
 
+class CompactMazeTest(unittest.TestCase):
+	def testStringRepresentationMatchesMaze(self):
+		m = getFinishedTestMaze()
+		self.assertEqual(str(m), str(CompactMaze.fromMaze(m)))
+		self.assertEqual(str(Maze(2,4)), str(CompactMaze(2,4)))
+
+	def testWriteAscii(self):
+		m = CompactMaze.fromMaze(getFinishedTestMaze())
+		stream = StringIO.StringIO()
+		m.writeAscii(stream)
+		self.assertEqual(str(getFinishedTestMaze()), stream.getvalue())
+
+	def testCellsHaveWalls(self):
+		m = CompactMaze(2,3)
+		self.assertEqual(2, len(m.cells))
+		self.assertEqual(3, len(m.cells[1]))
+		self.assertEqual(wall, m.cells[0][0].walls[east])
+		self.assertEqual(permanentwall, m.cells[0][0].walls[north])
+		self.assertEqual(permanentwall, m.cells[1][2].walls[east])
+		self.assertEqual(permanentwall, m.cells[1][2].walls[south])
+		self.assertEqual([permanentwall, wall, wall, permanentwall], list(m.cells[0][0].walls))
+
+	def testPackedWallsMatchesMaze(self):
+		m = Maze(3,4)
+		self.assertEqual(m.packedWalls(), CompactMaze(3,4).packedWalls())
+		m = getFinishedTestMaze()
+		self.assertEqual(m.packedWalls(), CompactMaze.fromMaze(m).packedWalls())
+
+	def testToMaze(self):
+		compact = CompactMaze.fromMaze(getFinishedTestMaze())
+		compact.finishCell = compact.cells[1][2]
+		m = compact.toMaze()
+		self.assertEqual(Maze, type(m))
+		self.assertEqual(Cell, type(m.cells[2][3]))
+		self.assertEqual(compact.packedWalls(), m.packedWalls())
+		self.assertEqual((1, 2), (m.finishCell.row, m.finishCell.col))
+		m.cells[0][0].openPassageInDirection(east)
+		self.assertEqual(getFinishedTestMaze().packedWalls(), compact.packedWalls())
+
+	def testCellsAreViewsOntoTheBuffer(self):
+		m = CompactMaze(2,2)
+		m.cells[0][0].walls[south] = passage
+		self.assertEqual(passage, m.cells[0][0].walls[south])
+		self.assertEqual(wall, m.cells[0][0].walls[east])
+		self.assertEqual(permanentwall, m.cells[0][0].walls[north])
+		self.assertEqual(passage << 4 | permanentwall | permanentwall << 6, m.wallBytes[0])
+
+	def testCellViewsCompareByPosition(self):
+		m = CompactMaze(3,3)
+		self.assertEqual(m.cells[1][1], m.cells[1][1])
+		self.assertNotEqual(m.cells[1][1], m.cells[1][2])
+		self.assertNotEqual(m.cells[1][1], None)
+		self.assertEqual(m.cells[2][2], m.finishCell)
+		self.assertEqual(m.cells[2][2], m.ordinalToCell(8))
+		self.assertEqual(1, len(set([m.cells[0][0], m.cells[0][0], m.startCell])))
+		self.assertRaises(IndexError, lambda: m.cells[3])
+		self.assertEqual(m.cells[2][2], m.cells[-1][-1])
+
+	def testOpenPassages(self):
+		m = CompactMaze(3,3)
+		c = m.cells[1][1]
+		for direction in directions:
+			c.openPassageInDirection(direction)
+		self.assertEqual([passage, passage, passage, passage], list(c.walls))
+		self.assertEqual(passage, m.cells[0][1].walls[south])
+		self.assertEqual(passage, m.cells[1][0].walls[east])
+		self.assertEqual(passage, m.cells[1][2].walls[west])
+		self.assertEqual(passage, m.cells[2][1].walls[north])
+		self.assertEqual(False, c.isInPassageway())
+		self.assertEqual(4, len(c.getAllAdjacentUnblockedCells()))
+
+	def testBulkWallQueriesMatchMaze(self):
+		m = getFinishedTestMaze()
+		compact = CompactMaze.fromMaze(m)
+		for region in [(), (1,), (0, 1), (1, 1, 2, 2), (2, 0, 1), (0, 3, 3, 1)]:
+			self.assertEqual(m.packedRegionWalls(*region), compact.packedRegionWalls(*region))
+			for direction in range(4):
+				self.assertEqual(m.blockedFlags(direction, *region), compact.blockedFlags(direction, *region))
+		self.assert_(compact.packedRegionWalls(0) is not compact.wallBytes)
+
+	def testNeighboursAreWorkedOutWithoutATable(self):
+		for height, width in [(1,1), (1,3), (4,1), (3,4), (5,6)]:
+			m, compact = Maze(height, width), CompactMaze(height, width)
+			self.assertEqual(list(m.neighbourTable()), [compact.neighbourOrdinal(ordinal, direction) for ordinal in range(height * width) for direction in range(4)])
+		self.assertEqual(None, compact.neighbours)
+		self.assertEqual(compact.cells[2][3], compact.cells[1][3].getAdjacentCell(south))
+		self.assertEqual(None, compact.cells[1][5].getAdjacentCell(east))
+
+	def testGenerate(self):
+		m = CompactMaze(10,12)
+		HuntAndKillGenerator(m).generate()
+		passages = sum([len(cell.getAllAdjacentUnblockedCells()) for row in m.cells for cell in row]) / 2
+		self.assertEqual(119, passages)
+		self.assertEqual(str(m), str(CompactMaze.fromMaze(m)))
+
+
 class HuntAndKillGeneratorTest(unittest.TestCase):
 	def setUp(self):
 		m = Maze(3,3)
@@ -389,6 +550,90 @@ class HuntAndKillGeneratorTest(unittest.TestCase):
 		for i in unvisitedCopy: self.g.moveCellFromUnvisitedToVisited(i)
 		self.assert_(self.g.getRandomVisitedCell().ordinal() in [0, 1, 2, 3, 4, 5, 6, 7, 8])
 		
+	def testMoveCellThatsAlreadyVisited(self):
+		self.g.moveCellFromUnvisitedToVisited(3)
+		self.assertRaises(ValueError, self.g.moveCellFromUnvisitedToVisited, 3)
+		self.assertEqual(8, len(self.g.unvisited))
+		self.assertEqual(1, len(self.g.visited))
+
+	def testGetRandomRestartCell(self):
+		self.assertEqual(None, self.g.getRandomRestartCell())	# nothing's visited, so there's nowhere to restart
+		g = getInProgressGeneratorWithVisitedCells()
+		for i in range(20):
+			# only visited cells next to one of the unvisited cells 0, 2 and 8 will do
+			self.assert_(g.getRandomRestartCell().ordinal() in [1, 3, 4, 6, 9])
+		unvisitedCopy = g.unvisited[:]
+		for i in unvisitedCopy: g.moveCellFromUnvisitedToVisited(i)
+		self.assertEqual(None, g.getRandomRestartCell())
+		self.assertEqual(0, len(g.restartCandidates))	# dead cells are dropped as they're found
+
+	def testStepHookIsCalledForEachStep(self):
+		steps = []
+		g = HuntAndKillGenerator(Maze(3,3), stepHook=lambda generator: steps.append(len(generator.visited)))
+		g.generate()
+		self.assert_(len(steps) >= 8)		# at least one step per carved passage, plus any dead ends
+		self.assertEqual(8, steps[-1])		# the last step is the one that finds the last unvisited cell
+
+	def testGenerateDoesntRenderTheMazeUnlessLogged(self):
+		m = CountingStrMaze(5,5)
+		logger = logging.getLogger()
+		oldLevel = logger.level
+		logger.setLevel(logging.WARNING)
+		try:
+			HuntAndKillGenerator(m).generate()
+		finally:
+			logger.setLevel(oldLevel)
+		self.assertEqual(0, m.strCalls)
+
+	def testSameSeedGeneratesSameMaze(self):
+		mazes = []
+		for rng in [42, 42, random.Random(42), 43]:
+			m = Maze(8,9)
+			HuntAndKillGenerator(m, rng=rng).generate()
+			mazes.append(str(m))
+		self.assertEqual(mazes[0], mazes[1])
+		self.assertEqual(mazes[0], mazes[2])
+		self.assertNotEqual(mazes[0], mazes[3])
+
+	def testFastRandomIsReproducible(self):
+		m1, m2 = Maze(8,9), Maze(8,9)
+		HuntAndKillGenerator(m1, rng=FastRandom(7)).generate()
+		HuntAndKillGenerator(m2, rng=FastRandom(7)).generate()
+		self.assertEqual(str(m1), str(m2))
+
+	def testGenerateLargerMazeVisitsEveryCell(self):
+		g = HuntAndKillGenerator(Maze(20,30))
+		g.generate()
+		self.assertEqual(0, len(g.unvisited))
+		self.assertEqual(600, len(g.visited))
+		passages = sum([len(cell.getAllAdjacentUnblockedCells()) for row in g.maze.cells for cell in row]) / 2
+		self.assertEqual(599, passages)		# a perfect maze is a spanning tree
+
+
+class CountingStrMaze(Maze):
+	def __init__(self, height, width):
+		Maze.__init__(self, height, width)
+		self.strCalls = 0
+
+	def __str__(self):
+		self.strCalls += 1
+		return Maze.__str__(self)
+
+class RngTest(unittest.TestCase):
+	def testMakeRng(self):
+		self.assertEqual(random, makeRng())
+		r = random.Random(1)
+		self.assert_(makeRng(r) is r)
+		self.assertEqual(random.Random(5).random(), makeRng(5).random())
+		self.assertEqual(random.Random(5).random(), makeRng(5L).random())
+
+	def testFastRandomRanges(self):
+		r = FastRandom(3)
+		self.assertEqual(set([0, 1, 2]), set([r.randrange(3) for i in range(200)]))
+		self.assertEqual(set([5, 6]), set([r.randrange(5, 7) for i in range(200)]))
+		self.assertEqual(set([1, 2, 3]), set([r.randint(1, 3) for i in range(200)]))
+		self.assertEqual(FastRandom(9).randrange(1000), FastRandom(9).randrange(1000))
+
 
 def getFinishedTestMaze():
 	# maze looks like this:
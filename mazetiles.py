@@ -0,0 +1,75 @@
+
+import sys
+import mmap
+import multiprocessing
+from maze import *
+from mazegenerators import EllersGenerator, KruskalsGenerator
+from mazebatch import generatePackedWalls
+from mazevalidate import isPerfectMaze
+
+# Generates one big maze on several cores at once. The grid is cut into tiles, and each tile is
+# generated as a perfect maze of its own by a worker process, which writes its walls straight
+# into a buffer of packed walls shared with the others (an anonymous mmap, so there's no copying
+# the results back). That leaves a forest of separate mazes; to join them into one perfect maze,
+# the tiles are treated as the cells of a small maze of their own, a random spanning tree of that
+# is made with Kruskal's, and for each of its passages exactly one passage is opened, at random,
+# through the border between the two tiles. A spanning tree of perfect mazes joined once along
+# each of its edges is itself a spanning tree, so the result has no loops and no cut off cells
+# (mazevalidate.isPerfectMaze checks).
+
+# maps a packed wall byte to the same byte with any permanent walls made plain walls - a tile's
+# corners come back with permanent walls that aren't on the edge of the whole maze
+withoutPermanentWalls = ''.join([chr(packWalls([wall if unpackWall(packed, direction) == permanentwall else unpackWall(packed, direction)
+												for direction in range(4)])) for packed in range(256)])
+
+sharedWalls = None		# the wall buffer, in the workers - see generateTile
+
+def shareWalls(walls):
+	global sharedWalls
+	sharedWalls = walls
+
+def generateTile(task):
+	"""Worker: generates one tile for a (top, left, tile height, tile width, maze width, seed, generatorClass) task and writes its walls into the shared buffer."""
+	top, left, height, width, mazeWidth, seed, generatorClass = task
+	tileWalls = generatePackedWalls((height, width, seed, generatorClass)).translate(withoutPermanentWalls)
+	for row in xrange(height):
+		start = (top + row) * mazeWidth + left
+		sharedWalls[start:start + width] = tileWalls[row * width:(row + 1) * width]
+
+def generateTiled(height, width, tileHeight=256, tileWidth=256, generatorClass=EllersGenerator, rng=None, processes=None):
+	"""Returns a 'height' by 'width' CompactMaze generated in tiles of up to 'tileHeight' by 'tileWidth' across 'processes' worker processes (by default one per CPU). Each tile uses 'generatorClass', and with the same 'rng' seed the maze comes out the same however many processes there are."""
+	rng = makeRng(rng)
+	tilesDown, tilesAcross = (height + tileHeight - 1) // tileHeight, (width + tileWidth - 1) // tileWidth
+	tasks = []
+	for tileRow in xrange(tilesDown):
+		for tileCol in xrange(tilesAcross):
+			top, left = tileRow * tileHeight, tileCol * tileWidth
+			tasks.append((top, left, min(tileHeight, height - top), min(tileWidth, width - left), width, rng.randrange(sys.maxint), generatorClass))
+
+	walls = mmap.mmap(-1, height * width)		# anonymous, so it's shared with the workers forked below
+	pool = multiprocessing.Pool(processes, shareWalls, (walls,))
+	try:
+		pool.map(generateTile, tasks)
+	finally:
+		pool.terminate()
+		pool.join()
+	maze = CompactMaze(height, width, walls)		# copied straight into its bytearray, without slicing out a string first
+	walls.close()
+
+	# join the tiles: a passage between two tiles in the tile maze becomes a passage at a random
+	# spot along the border between them
+	tileMaze = CompactMaze(tilesDown, tilesAcross)
+	KruskalsGenerator(tileMaze, rng=rng).generate()
+	for tileRow in xrange(tilesDown):
+		for tileCol in xrange(tilesAcross):
+			top, left = tileRow * tileHeight, tileCol * tileWidth
+			tileWalls = tileMaze.cells[tileRow][tileCol].walls
+			if tileCol < tilesAcross - 1 and tileWalls[east] == passage:
+				row = rng.randrange(top, min(top + tileHeight, height))
+				maze.cells[row][left + tileWidth - 1].openPassageInDirection(east)
+			if tileRow < tilesDown - 1 and tileWalls[south] == passage:
+				col = rng.randrange(left, min(left + tileWidth, width))
+				maze.cells[top + tileHeight - 1][col].openPassageInDirection(south)
+	maze.setEdgesToPermanentWalls()
+	maze.wallsChanged()
+	return maze
@@ -0,0 +1,33 @@
+
+import unittest
+from mazetiles import *
+from mazegenerators import RecursiveBacktrackerGenerator
+
+
+class MazeTilesTest(unittest.TestCase):
+	def testTiledMazesArePerfect(self):
+		for height, width, tileHeight, tileWidth in [(1,1,4,4), (8,8,4,4), (9,13,4,5), (20,7,3,3), (5,30,5,1), (6,6,10,10)]:
+			m = generateTiled(height, width, tileHeight, tileWidth, rng=height * width, processes=2)
+			self.assertEqual((height, width), (m.height, m.width))
+			self.assert_(isPerfectMaze(m))
+
+	def testEdgesArePermanentOnlyAtTheMazesCorners(self):
+		m = generateTiled(8, 8, 4, 4, rng=1, processes=2)
+		self.assertEqual(permanentwall, m.cells[0][0].walls[north])
+		self.assertEqual(permanentwall, m.cells[7][7].walls[east])
+		self.assertNotEqual(permanentwall, m.cells[3][3].walls[east])
+		self.assertNotEqual(permanentwall, m.cells[4][4].walls[north])
+
+	def testSameSeedGivesTheSameMazeWithAnyNumberOfProcesses(self):
+		one = generateTiled(12, 15, 5, 5, rng=7, processes=1)
+		three = generateTiled(12, 15, 5, 5, rng=7, processes=3)
+		self.assertEqual(str(one), str(three))
+		self.assertNotEqual(str(one), str(generateTiled(12, 15, 5, 5, rng=8, processes=1)))
+
+	def testOtherGenerators(self):
+		for generatorClass in [HuntAndKillGenerator, RecursiveBacktrackerGenerator]:
+			self.assert_(isPerfectMaze(generateTiled(10, 10, 4, 4, generatorClass, rng=3, processes=2)))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -1,86 +1,155 @@
 
 import pygame
-import random
-import time		# for sleep
+import re
+import time
 from pygame.locals import *
 from sys import exit
 from maze import *
+from mazegraph import CorridorGraph
+from mazegenerators import flagsToLanes, lanesToFlags
+from mazebatch import MazePrefetcher
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 MAZE_WIDTH = 4
 MAZE_HEIGHT = 3
 KEY_REPEAT_DELAY = 300		# ms, amount of time to repeat held down key events
-AUTO_MOVE_DELAY = 0.1		# sec (for time.sleep) and to delay between automatic moves
+AUTO_MOVE_DELAY = 0.1		# sec, to delay between automatic moves
+FINISHED_PAUSE = 2			# sec, to show a finished maze before starting the next one
+FRAMES_PER_SECOND = 60		# at most, while something's moving
 
 BACKGROUND_COLOR = (0, 0, 0)
 CURRENT_COLOR = (0, 255, 0)
 VISITED_COLOR = (0, 96, 0)
 FINISH_COLOR = (0, 0, 96)
+WALL_COLOR = (128, 128, 128)
 
 def main():
 	pygame.init()
 	screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), 0, 32)
 	pygame.key.set_repeat(KEY_REPEAT_DELAY, KEY_REPEAT_DELAY)		# send repeated KEYDOWN events if a key is held down
 
-	lastCell = None
-	mui, currentCell = createAndDrawNewMaze(MAZE_WIDTH, MAZE_HEIGHT, screen)
-
-	while True:
-		for event in pygame.event.get():
-			if event.type == KEYDOWN:
-				nextCell = mui.moveToNewCellWithUserInput(currentCell, event.key)
-				if nextCell:
-					lastCell, currentCell = drawCellsAndReturnLastAndNowCurrentCells(mui, currentCell, nextCell)
-			if event.type == QUIT:
-				exit()
-		
-		mui, currentCell, lastCell = createNewMazeIfCurrentMazeSolved(mui, currentCell, lastCell)		
-		
-		while lastCell != None and currentCell.isInPassageway():
-			# we can keep on moving, automatically
-			time.sleep(AUTO_MOVE_DELAY)	# pause for just a bit so we don't move too fast
-			nextCell = currentCell.getAdjacentPassagewayExitCell(lastCell)
-			lastCell, currentCell = drawCellsAndReturnLastAndNowCurrentCells(mui, currentCell, nextCell)
-			mui, currentCell, lastCell = createNewMazeIfCurrentMazeSolved(mui, currentCell, lastCell)		
+	prefetcher = MazePrefetcher()		# generates each next level in the background while this one's played
+	try:
+		MazeGame(screen, prefetcher).run()
+	finally:
+		prefetcher.close()
+	exit()
 			
 
 def drawCellsAndReturnLastAndNowCurrentCells(mui, currentCell, newCurrentCell):
 	"""Draws the new current cell as current and the old current cell as visited, and then returns the same references as last cell and the now-current cell."""
 	mui.drawCurrentCellAndVisitLastCell(currentCell, newCurrentCell)
-	pygame.display.update()
+	mui.updateDisplay()
 
 	lastCell, currentCell = currentCell, newCurrentCell	# obviously could be combined, but this explicit code at least says what I'm trying to mean (somewhat)
 	return lastCell, currentCell
 
-def createAndDrawNewMaze(mazeWidth, mazeHeight, screen):
-	"""Creates a new MazeUI instance, generates a maze, and then draws it. Returns both the MazeUI instance and the current/start cell."""
-	mui = MazeUI(mazeWidth, mazeHeight, screenWidth=SCREEN_WIDTH, screenHeight=SCREEN_HEIGHT, screen=screen, offsetPixels=True)
-	HuntAndKillGenerator(mui.maze).generate()
-	mui.screen.fill(BACKGROUND_COLOR)
+def createAndDrawNewMaze(mazeWidth, mazeHeight, screen, prefetcher=None):
+	"""Creates a new MazeUI instance, generates a maze, and then draws it. Returns both the MazeUI instance and the current/start cell. With a MazePrefetcher, the maze comes from that (already generated, if it was asked for in time) and the next level's maze is asked for straight away."""
+	if prefetcher != None:
+		maze = prefetcher.take(mazeHeight, mazeWidth)
+	else:
+		maze = None
+	mui = MazeUI(mazeWidth, mazeHeight, screenWidth=SCREEN_WIDTH, screenHeight=SCREEN_HEIGHT, screen=screen, offsetPixels=True, maze=maze)
+	if prefetcher != None:
+		nextWidth, nextHeight = mui.getDimensionsOfNextMaze()
+		prefetcher.start(nextHeight, nextWidth)
+	else:
+		HuntAndKillGenerator(mui.maze, rng=mui.rng).generate()
 	mui.drawMaze()
 
 	# start off in the upper-left corner
 	currentCell = mui.maze.cells[0][0]	
 	mui.drawCurrentCell(currentCell)
-	pygame.display.update()
+	mui.updateDisplay()
 
 	return mui, currentCell
 
-def createNewMazeIfCurrentMazeSolved(mui, currentCell, lastCell):
-	"""Create and return a new maze if the current cell is the same as the finish cell. If not, just return what was passed in (to make it easier to call this w/o conditional code)."""
-	if currentCell == mui.maze.finishCell:
-		# woohoo - finished the maze. pause a few secs and then start a new one with one more row and col
-		time.sleep(2)
-		newWidth, newHeight = mui.getDimensionsOfNextMaze()
-		lastCell = None
-		mui, currentCell = createAndDrawNewMaze(newWidth, newHeight, mui.screen)
-	return mui, currentCell, lastCell
+
+class MazeGame(object):
+	"""Plays level after level on 'screen'. Nothing here sleeps: auto-moves along a corridor and the pause after finishing a level are scheduled for a time, and run only wakes up when that time comes or there's input, so keys are answered straight away - pressing one mid-corridor stops the slide and takes the move - and an idle game doesn't use the CPU."""
+	def __init__(self, screen, prefetcher=None, autoMoveDelay=AUTO_MOVE_DELAY, finishedPause=FINISHED_PAUSE):
+		self.screen = screen
+		self.prefetcher = prefetcher
+		self.autoMoveDelay = autoMoveDelay
+		self.finishedPause = finishedPause
+		self.running = True
+		self.startLevel(*createAndDrawNewMaze(MAZE_WIDTH, MAZE_HEIGHT, screen, prefetcher))
+
+	def startLevel(self, mui, currentCell):
+		self.mui = mui
+		self.currentCell = currentCell
+		self.autoMoves = []			# ordinals of the rest of the corridor we're sliding along
+		self.nextAutoMoveAt = None
+		self.nextLevelAt = None		# set once the level's finished
+
+	def run(self):
+		"""Handles events and scheduled updates until the window's closed. While something's scheduled, the clock keeps this to FRAMES_PER_SECOND; otherwise it waits for the next event."""
+		clock = pygame.time.Clock()
+		while self.running:
+			if self.timeUntilNextUpdate() == None:
+				events = [pygame.event.wait()] + pygame.event.get()
+			else:
+				clock.tick(FRAMES_PER_SECOND)
+				events = pygame.event.get()
+			for event in events:
+				self.handleEvent(event)
+			self.update()
+
+	def handleEvent(self, event, now=None):
+		if now == None: now = time.time()
+		if event.type == KEYDOWN and self.nextLevelAt == None:
+			nextCell = self.mui.moveToNewCellWithUserInput(self.currentCell, event.key)
+			if nextCell:
+				self.autoMoves = []		# a key press takes over from any auto-moving
+				self.moveTo(nextCell, now)
+		if event.type == QUIT:
+			self.running = False
+
+	def moveTo(self, nextCell, now):
+		"""moves to 'nextCell' and lines up any auto-moves along the corridor it's in"""
+		lastCell, self.currentCell = drawCellsAndReturnLastAndNowCurrentCells(self.mui, self.currentCell, nextCell)
+		if self.currentCell == self.mui.maze.finishCell:
+			# woohoo - finished the maze. pause a bit and then start a new one with one more row and col
+			self.autoMoves = []
+			self.nextLevelAt = now + self.finishedPause
+		elif not self.autoMoves:
+			self.autoMoves = self.mui.corridors.corridorAhead(lastCell.ordinal(), self.currentCell.ordinal())
+			self.autoMoves.reverse()		# so the next one can be popped off the end
+			self.nextAutoMoveAt = now + self.autoMoveDelay
+
+	def update(self, now=None):
+		"""does whatever's been scheduled for 'now' or before"""
+		if now == None: now = time.time()
+		if self.nextLevelAt != None and now >= self.nextLevelAt:
+			newWidth, newHeight = self.mui.getDimensionsOfNextMaze()
+			self.startLevel(*createAndDrawNewMaze(newWidth, newHeight, self.screen, self.prefetcher))
+		while self.autoMoves and now >= self.nextAutoMoveAt:
+			# catching up on every move that's due, so the slide keeps its speed however late this is called
+			movedAt = self.nextAutoMoveAt
+			self.nextAutoMoveAt += self.autoMoveDelay
+			self.moveTo(self.mui.maze.ordinalToCell(self.autoMoves.pop()), movedAt)
+
+	def timeUntilNextUpdate(self, now=None):
+		"""returns the seconds until update next has something to do, or None if it's waiting on input"""
+		if now == None: now = time.time()
+		if self.nextLevelAt != None:
+			return max(0, self.nextLevelAt - now)
+		if self.autoMoves:
+			return max(0, self.nextAutoMoveAt - now)
+		return None
 
 
 class MazeUI(object):
-	def __init__(self, mazeWidth, mazeHeight, wallWidth=2, screenWidth=SCREEN_WIDTH, screenHeight=SCREEN_HEIGHT, screen=None, innerWidth=None, offsetPixels=False):
-		self.maze = Maze(mazeHeight, mazeWidth)
+	def __init__(self, mazeWidth, mazeHeight, wallWidth=2, screenWidth=SCREEN_WIDTH, screenHeight=SCREEN_HEIGHT, screen=None, innerWidth=None, offsetPixels=False, rng=None, maze=None):
+		"""'maze', if given, is an already generated maze to show (mazeWidth and mazeHeight should match it); otherwise there's a new, ungenerated one."""
+		if maze != None:
+			self.maze = maze
+		else:
+			self.maze = Maze(mazeHeight, mazeWidth)
+		self.rng = makeRng(rng)		# used to generate the maze and for random moves - see makeRng
+		self.corridors = CorridorGraph(self.maze)		# for auto-moving along corridors; builds itself once the maze is generated
 		self.wallWidth = wallWidth
 		self.screenWidth = screenWidth
 		self.screenHeight = screenHeight
@@ -102,12 +171,62 @@ class MazeUI(object):
 		else:
 			self.widthPixelOffset = 0
 			self.heightPixelOffset = 0
+		# where each wall's line starts and ends, relative to its cell's origin
+		cellDiff = self.wallWidth + self.innerWidth
+		self.wallLineOffsets = {north: ((0, 0),        (cellDiff, 0)),
+								south: ((0, cellDiff), (cellDiff, cellDiff)),
+								east:  ((cellDiff, 0), (cellDiff, cellDiff)),
+								west:  ((0, 0),        (0, cellDiff))}
+		self.background = None		# the walls and finish, drawn once - see drawMaze
+		self.backgroundDrawnAt = None
+		self.dirtyRects = []		# the parts of the screen drawn on since the last updateDisplay
 	
 	def drawMaze(self):
-		for cell in flatten(self.maze.cells):
-			for direction in directions:
-				if (cell.walls[direction] in blocked): self.drawWall(cell, direction)
-		self.drawCircle(FINISH_COLOR, self.maze.finishCell)
+		"""Copies the walls and finish onto the screen from the cached background, drawing that first if the maze has changed since it was last drawn."""
+		if self.backgroundDrawnAt != self.maze.changeCount:
+			self.drawBackground()
+		self.dirtyRects.append(self.screen.blit(self.background, (0, 0)))
+
+	def drawBackground(self):
+		"""Draws the parts of the screen that don't change as you move - the background color, the walls and the finish - onto a surface of their own."""
+		self.background = pygame.Surface(self.screen.get_size(), 0, self.screen)
+		self.background.fill(BACKGROUND_COLOR)
+		for start, end in self.wallSegments():
+			pygame.draw.line(self.background, WALL_COLOR, start, end, self.wallWidth)
+		self.drawCircle(FINISH_COLOR, self.maze.finishCell, self.background)
+		self.backgroundDrawnAt = self.maze.changeCount
+
+	def wallSegments(self):
+		"""Returns the maze's walls as (start, end) pixel pairs for drawing lines between. Each wall is in there once, though both the cells either side of it have it, and walls next to each other along the same line are merged into one long line."""
+		height, width = self.maze.height, self.maze.width
+		cellDiff = self.wallWidth + self.innerWidth
+		segments = []
+		# for each direction, a flag per cell saying if it has a wall that way; a row or column of
+		# cells is a stretch of those, and the runs of 1s along it are the lines
+		blockedTo = [self.maze.blockedFlags(direction) for direction in range(4)]
+		def addLines(flags, lineStart):
+			for run in re.finditer('\x01+', flags):
+				segments.append((lineStart(run.start()), lineStart(run.end())))
+		def lineAlongRow(row):
+			y = self.heightPixelOffset + row * cellDiff
+			return lambda col: (self.widthPixelOffset + col * cellDiff, y)
+		def lineAlongCol(col):
+			x = self.widthPixelOffset + col * cellDiff
+			return lambda row: (x, self.heightPixelOffset + row * cellDiff)
+
+		for row in range(height + 1):
+			southOfRowAbove = blockedTo[south][(row - 1) * width:row * width] if row > 0 else ''
+			addLines(combineFlags(southOfRowAbove, blockedTo[north][row * width:(row + 1) * width], width), lineAlongRow(row))
+		for col in range(width + 1):
+			eastOfColLeft = blockedTo[east][col - 1::width] if col > 0 else ''
+			westOfCol = blockedTo[west][col::width] if col < width else ''
+			addLines(combineFlags(eastOfColLeft, westOfCol, height), lineAlongCol(col))
+		return segments
+
+	def updateDisplay(self):
+		"""Pushes just the parts of the screen that have been drawn on since the last update to the display."""
+		pygame.display.update(self.dirtyRects)
+		self.dirtyRects = []
 	
 	def moveToNewCellWithUserInput(self, currentCell, key):
 		"""Move from the current cell to a specified new cell, using a K_UP, etc 'key'. Return the new current cell, or None if the cell doesn't change (because a non-directional key was pressed or because the direction was blocked, for example)."""
@@ -128,7 +247,7 @@ class MazeUI(object):
 		# If called from the main loop like the following, the maze'll be visited randomly
 		# currentCell = moveToRandomNewCell(currentCell)
 		# pygame.display.update()
-		nextCell = random.choice(currentCell.getAllAdjacentUnblockedCells())
+		nextCell = self.rng.choice(currentCell.getAllAdjacentUnblockedCells())
 		self.drawCurrentCellAndVisitLastCell(currentCell, nextCell)
 		return nextCell
 				
@@ -140,35 +259,32 @@ class MazeUI(object):
 	def drawCurrentCell(self, currentCell):
 		self.drawCircle(CURRENT_COLOR, currentCell)
 
-	def drawWall(self, cell, direction):
-		"""Draw a wall, for the provided 'cell', in the provided 'direction'. Doesn't check to see if there's actually a wall in that direction (you should do that before calling this method)."""
-		origin = self.getOriginForCell(cell)
-		start = self.getStartOfWallLine(cell, direction)
-		end = self.getEndOfWallLine(cell, direction)
-		pygame.draw.line(self.screen, (128,128,128), start, end, self.wallWidth)
+	def drawWall(self, cell, direction, surface=None):
+		"""Draw a wall, for the provided 'cell', in the provided 'direction', on 'surface' (the screen by default). Doesn't check to see if there's actually a wall in that direction (you should do that before calling this method)."""
+		x, y = self.getOriginForCell(cell)
+		(startX, startY), (endX, endY) = self.wallLineOffsets[direction]
+		if surface == None:
+			surface = self.screen
+		pygame.draw.line(surface, WALL_COLOR, (x + startX, y + startY), (x + endX, y + endY), self.wallWidth)
 
-	def drawCircle(self, color, cell):
+	def drawCircle(self, color, cell, surface=None):
+		"""Draws a circle in the middle of 'cell' on 'surface'. If that's the screen (the default), the circle's rect is remembered for updateDisplay."""
 		cellCenter = self.getCenterForCell(cell)
 		radius = self.innerWidth / 3
-		pygame.draw.circle(self.screen, color, cellCenter, radius)	
+		if surface == None:
+			self.dirtyRects.append(pygame.draw.circle(self.screen, color, cellCenter, radius))
+		else:
+			pygame.draw.circle(surface, color, cellCenter, radius)
 
 	def getStartOfWallLine(self, cell, direction):
 		x, y = self.getOriginForCell(cell)
-		cellDiff = self.wallWidth + self.innerWidth
-		start = {north: (x, y),
-				 south: (x, y + cellDiff),
-				 east:  (x + cellDiff, y),
-				 west:  (x, y)}[direction]
-		return start
+		offsetX, offsetY = self.wallLineOffsets[direction][0]
+		return (x + offsetX, y + offsetY)
 
 	def getEndOfWallLine(self, cell, direction):
 		x, y = self.getOriginForCell(cell)
-		cellDiff = self.wallWidth + self.innerWidth
-		end =   {north: (x + cellDiff, y),
-				 south: (x + cellDiff, y + cellDiff),
-				 east:  (x + cellDiff, y + cellDiff),
-				 west:  (x, y + cellDiff)}[direction]
-		return end
+		offsetX, offsetY = self.wallLineOffsets[direction][1]
+		return (x + offsetX, y + offsetY)
 
 	def getOriginForCell(self, cell):
 		# the pixel offsets are set to 0 if we don't specify that we want offsetting when we create the maze UI
@@ -193,10 +309,14 @@ class MazeUI(object):
 		
 		return (newWidth, newHeight)
 	
+def combineFlags(flags, otherFlags, length):
+	"""Returns a bytearray of 'length' 0/1 flags with a 1 wherever either of the flag bytearrays (see Maze.blockedFlags) has one. Either can be '', for no flags at all."""
+	return lanesToFlags(flagsToLanes(flags or '\0') | flagsToLanes(otherFlags or '\0'), length)
+
 # could be a non-maze UI utility function
 def flatten(list):
-	"""Flattens the passed list - which can have nested lists, like you might get with maze.cells - into a single list."""
-	return sum(list, [])
+	"""Flattens the passed list - which can have nested lists, like you might get with maze.cells - into a single list. To go through a maze's cells, Maze.iterCells does the same without building the list."""
+	return [item for sublist in list for item in sublist]
 	
 
 if __name__ == '__main__':
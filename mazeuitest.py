@@ -1,6 +1,8 @@
 
+import os
 import unittest
 from mazeui import *
+from mazetest import getFinishedTestMaze
 
 
 class MazeUITest(unittest.TestCase):
@@ -169,6 +171,138 @@ class MazeUITest(unittest.TestCase):
 	
 	# TODO I could also in theory test that the current/visited circles are drawn where I want them to be drawn
 
+	def testDrawMazeMatchesDrawingEachWall(self):
+		for mazeWidth, mazeHeight, wallWidth in [(4,3,2), (12,9,1), (12,9,2), (7,5,5)]:
+			mui = MazeUI(mazeWidth,mazeHeight,wallWidth,200,150,screen=pygame.Surface((200,150)),offsetPixels=True,rng=wallWidth)
+			HuntAndKillGenerator(mui.maze, rng=mui.rng).generate()
+			mui.drawMaze()
+			expected = pygame.Surface((200,150))
+			expected.fill(BACKGROUND_COLOR)
+			for cell in mui.maze.iterCells():
+				for direction in directions:
+					if cell.walls[direction] in blocked: mui.drawWall(cell, direction, expected)
+			mui.drawCircle(FINISH_COLOR, mui.maze.finishCell, expected)
+			self.assertEqual(pygame.image.tostring(expected, 'RGB'), pygame.image.tostring(mui.screen, 'RGB'))
+
+	def testWallSegmentsAreMergedAndOnlyListedOnce(self):
+		mui = MazeUI(3,2,wallWidth=1,innerWidth=1)
+		self.assertEqual([((0,0), (6,0)), ((0,2), (6,2)), ((0,4), (6,4)),
+						  ((0,0), (0,4)), ((2,0), (2,4)), ((4,0), (4,4)), ((6,0), (6,4))], mui.wallSegments())
+		mui.maze.cells[0][1].openPassageInDirection(south)
+		mui.maze.cells[1][1].openPassageInDirection(east)
+		self.assertEqual([((0,0), (6,0)), ((0,2), (2,2)), ((4,2), (6,2)), ((0,4), (6,4)),
+						  ((0,0), (0,4)), ((2,0), (2,4)), ((4,0), (4,2)), ((6,0), (6,4))], mui.wallSegments())
+
+	def testBackgroundIsOnlyDrawnAgainWhenTheMazeChanges(self):
+		mui = getGeneratedMazeUI()
+		mui.drawMaze()
+		background = mui.background
+		mui.drawMaze()
+		self.assert_(background is mui.background)
+		mui.maze.cells[0][0].openPassageInDirection(east)
+		mui.drawMaze()
+		self.assert_(background is not mui.background)
+
+	def testMovingOnlyDirtiesTheTwoCells(self):
+		mui = getGeneratedMazeUI()
+		mui.drawMaze()
+		self.assertEqual([pygame.Rect(0, 0, 200, 150)], mui.dirtyRects)
+		mui.dirtyRects = []
+		lastCell, currentCell = mui.maze.cells[1][1], mui.maze.cells[1][2]
+		mui.drawCurrentCellAndVisitLastCell(lastCell, currentCell)
+		self.assertEqual(2, len(mui.dirtyRects))
+		self.assert_(mui.dirtyRects[0].collidepoint(mui.getCenterForCell(currentCell)))
+		self.assert_(mui.dirtyRects[1].collidepoint(mui.getCenterForCell(lastCell)))
+		cellSize = mui.innerWidth + 2 * mui.wallWidth
+		for rect in mui.dirtyRects:
+			self.assert_(rect.width <= cellSize and rect.height <= cellSize)
+
+	def testShowsAnAlreadyGeneratedMaze(self):
+		m = CompactMaze(3,4)
+		mui = MazeUI(4,3,maze=m)
+		self.assert_(m is mui.maze)
+
+	def testUpdateDisplayForgetsTheDirtyRects(self):
+		os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')		# no window needed
+		pygame.display.init()
+		try:
+			mui = getGeneratedMazeUI(pygame.display.set_mode((200,150)))
+			mui.drawMaze()
+			mui.updateDisplay()
+			self.assertEqual([], mui.dirtyRects)
+		finally:
+			pygame.display.quit()
+
+
+class MazeGameTest(unittest.TestCase):
+	def setUp(self):
+		os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+		pygame.display.init()
+		screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+		self.game = MazeGame(screen, autoMoveDelay=0.1, finishedPause=2)
+		# the test maze, with its ordinals:
+		#  _______          0  1  2  3
+		# |__ ___ |         4  5  6  7
+		# |__ __| |         8  9 10 11
+		# |___|___|
+		mui = MazeUI(4,3,screen=screen,offsetPixels=True,maze=getFinishedTestMaze())
+		mui.drawMaze()
+		self.game.startLevel(mui, mui.maze.cells[0][0])
+
+	def tearDown(self):
+		pygame.display.quit()
+
+	def pressKey(self, key, now):
+		self.game.handleEvent(pygame.event.Event(KEYDOWN, key=key), now)
+
+	def testSlidesAlongCorridorsOnTheClock(self):
+		self.pressKey(K_RIGHT, 100)
+		self.assertEqual(None, self.game.timeUntilNextUpdate(100))		# 1 is a junction, so there's nowhere to slide
+		self.pressKey(K_RIGHT, 100)
+		self.assertEqual(2, self.game.currentCell.ordinal())
+		self.assertAlmostEqual(0.1, self.game.timeUntilNextUpdate(100))
+		self.game.update(100.05)
+		self.assertEqual(2, self.game.currentCell.ordinal())
+		self.game.update(100.1)
+		self.assertEqual(3, self.game.currentCell.ordinal())
+		self.game.update(100.35)		# late, so it catches up on two moves, which reaches the finish
+		self.assertEqual(11, self.game.currentCell.ordinal())
+		self.assertAlmostEqual(1.0, self.game.timeUntilNextUpdate(101.3))
+
+	def testNextLevelStartsAfterThePause(self):
+		for key in [K_RIGHT, K_RIGHT]:
+			self.pressKey(key, 100)
+		self.game.update(100.3)
+		self.pressKey(K_LEFT, 101)		# ignored while the finished maze is shown
+		self.assertEqual(11, self.game.currentCell.ordinal())
+		self.game.update(102.2)
+		self.assertEqual((3,4), (self.game.mui.maze.height, self.game.mui.maze.width))
+		self.game.update(102.3)
+		self.assertEqual((4,5), (self.game.mui.maze.height, self.game.mui.maze.width))
+		self.assertEqual(0, self.game.currentCell.ordinal())
+		self.assertEqual(None, self.game.timeUntilNextUpdate(102.3))
+
+	def testKeyPressStopsTheSlide(self):
+		for key in [K_RIGHT, K_RIGHT]:
+			self.pressKey(key, 100)
+		self.pressKey(K_LEFT, 100.05)
+		self.assertEqual(1, self.game.currentCell.ordinal())
+		self.assertEqual(None, self.game.timeUntilNextUpdate(100.05))
+		self.game.update(101)
+		self.assertEqual(1, self.game.currentCell.ordinal())
+
+	def testQuitStopsTheGame(self):
+		self.game.handleEvent(pygame.event.Event(QUIT))
+		self.assertEqual(False, self.game.running)
+
+
+def getGeneratedMazeUI(screen=None):
+	if screen == None:
+		screen = pygame.Surface((200,150))
+	mui = MazeUI(4,3,screenWidth=200,screenHeight=150,screen=screen,rng=1)
+	HuntAndKillGenerator(mui.maze, rng=mui.rng).generate()
+	return mui
+
 	
 	
 if __name__ == '__main__':
@@ -0,0 +1,85 @@
+
+from array import array
+from maze import *
+from mazesolver import passableWalls, passageSteps, passageCounts
+
+# Checks that a maze is a proper perfect maze: nothing leads off the edge, permanent walls are
+# only found on the border, the two cells either side of each wall agree about it, and there's
+# exactly one way between any two cells - every cell can be reached, and there's one fewer
+# passage than there are cells, so there's nowhere for a loop to be.
+#
+# Everything works on the maze's packed walls (see CompactMaze): each direction's wall states
+# are translated out of the bytes in one go, compared as whole strings, and only searched cell
+# by cell when something's wrong. Reachability is a single breadth-first search over ordinals,
+# so the whole check is linear in the number of cells.
+
+# for each packed wall byte, the state - wall, permanentwall or passage - of the wall in each direction
+stateOf = [''.join([chr(unpackWall(packed, direction)) for packed in range(256)]) for direction in range(4)]
+
+def findProblems(maze, examples=3):
+	"""Returns a list of descriptions of whatever stops the maze being a perfect maze, or [] if it is one. Problems found at lots of cells are described once, with up to 'examples' of the cells."""
+	height, width = maze.height, maze.width
+	cellCount = height * width
+	walls = bytearray(maze.packedWalls())
+	states = [walls.translate(stateOf[direction]) for direction in range(4)]
+	problems = []
+	def describe(ordinals, count, what):
+		cells = ', '.join(['(%s, %s)' % divmod(ordinal, width) for ordinal in ordinals[:examples]])
+		problems.append('%s %s %s: %s%s' % (count, count == 1 and 'cell has' or 'cells have', what, cells, count > examples and ', ...' or ''))
+
+	# the ordinals of the cells along each edge of the maze, as (start, stop, step)
+	edges = {north: (0, width, 1), south: (cellCount - width, cellCount, 1),
+			 west: (0, cellCount, width), east: (width - 1, cellCount, width)}
+	for direction, name in [(north, 'north'), (east, 'east'), (south, 'south'), (west, 'west')]:
+		edge = xrange(*edges[direction])
+		offEdge = [ordinal for ordinal in edge if states[direction][ordinal] == passage]
+		if offEdge:
+			describe(offEdge, len(offEdge), 'a passage %s off the edge of the maze' % name)
+		inside = states[direction][:]
+		inside[slice(*edges[direction])] = bytearray(len(edge))		# the edge can have permanent walls, so don't look there
+		if inside.count(chr(permanentwall)):
+			describe(findAll(inside, chr(permanentwall), examples), inside.count(chr(permanentwall)), 'a permanent wall to the %s inside the maze' % name)
+
+	# each east wall has to match the west wall of the cell to its right, and each south wall the north wall of the cell below
+	eastWalls, westWalls = states[east][:], states[west][:]
+	eastWalls[slice(*edges[east])] = bytearray(height)
+	westWalls[slice(*edges[west])] = bytearray(height)
+	for cellWalls, neighbourWalls, offset, name in [(eastWalls, westWalls, 1, 'an east'), (states[south], states[north], width, 'a south')]:
+		if cellWalls[:cellCount - offset] != neighbourWalls[offset:]:
+			mismatched = [ordinal for ordinal in xrange(cellCount - offset) if cellWalls[ordinal] != neighbourWalls[ordinal + offset]]
+			describe(mismatched, len(mismatched), "%s wall that the next cell doesn't agree with" % name)
+
+	passages, reached = countPassagesAndReachableCells(maze)
+	if passages != cellCount - 1:
+		problems.append('there are %s passages, but a perfect maze of %s cells has %s' % (passages, cellCount, cellCount - 1))
+	if reached != cellCount:
+		problems.append("%s of the %s cells can't be reached from the top left one" % (cellCount - reached, cellCount))
+	return problems
+
+def isPerfectMaze(maze):
+	"""returns True if findProblems finds nothing wrong with the maze"""
+	return findProblems(maze, examples=0) == []
+
+def countPassagesAndReachableCells(maze):
+	"""returns the number of passages between cells (counting a passage that's only open from one side as half) and how many cells can be reached from the top left one"""
+	walls = passableWalls(maze)
+	steps = passageSteps(maze.width)
+	passageEnds = sum(walls.translate(passageCounts))
+	seen = bytearray(len(walls))
+	seen[0] = 1
+	queue = array('l', [0])
+	for ordinal in queue:
+		for step in steps[walls[ordinal]]:
+			if not seen[ordinal + step]:
+				seen[ordinal + step] = 1
+				queue.append(ordinal + step)
+	return passageEnds // 2, len(queue)
+
+def findAll(flags, value, limit):
+	"""returns the positions of the first 'limit' bytes in 'flags' equal to 'value'"""
+	found = []
+	position = flags.find(value)
+	while position != -1 and len(found) < limit:
+		found.append(position)
+		position = flags.find(value, position + 1)
+	return found
@@ -0,0 +1,72 @@
+
+import unittest
+from mazevalidate import *
+from mazegenerators import generators
+
+
+class MazeValidateTest(unittest.TestCase):
+	def testGeneratedMazesArePerfect(self):
+		for name, generatorClass in generators.items():
+			m = CompactMaze(9,13)
+			generatorClass(m, rng=2).generate()
+			self.assertEqual([], findProblems(m), name)
+			self.assert_(isPerfectMaze(m))
+
+	def testOneCellMazeIsPerfect(self):
+		self.assertEqual([], findProblems(Maze(1,1)))
+
+	def testTooFewPassages(self):
+		m = Maze(2,2)
+		m.cells[0][0].openPassageInDirection(east)
+		self.assertEqual(['there are 1 passages, but a perfect maze of 4 cells has 3',
+						  "2 of the 4 cells can't be reached from the top left one"], findProblems(m))
+		self.assertEqual(False, isPerfectMaze(m))
+
+	def testLoops(self):
+		m = Maze(2,3)
+		m.cells[0][0].openPassageInDirection(east)
+		m.cells[0][1].openPassageInDirection(east)
+		m.cells[0][1].openPassageInDirection(south)
+		m.cells[0][2].openPassageInDirection(south)
+		m.cells[1][1].openPassageInDirection(east)
+		# the right number of passages, but with a loop, so (1,0) is cut off
+		self.assertEqual(["1 of the 6 cells can't be reached from the top left one"], findProblems(m))
+
+	def testWallsThatDontMatch(self):
+		m = Maze(3,3)
+		HuntAndKillGenerator(m, rng=1).generate()
+		m.cells[1][1].walls[east] = passage if m.cells[1][1].walls[east] != passage else wall
+		m.cells[0][2].walls[south] = passage if m.cells[0][2].walls[south] != passage else wall
+		problems = findProblems(m)
+		self.assert_("1 cell has an east wall that the next cell doesn't agree with: (1, 1)" in problems)
+		self.assert_("1 cell has a south wall that the next cell doesn't agree with: (0, 2)" in problems)
+
+	def testPermanentWallsInside(self):
+		m = Maze(3,4)
+		HuntAndKillGenerator(m, rng=1).generate()
+		for col in range(4):
+			m.cells[1][col].walls[north] = permanentwall
+			m.cells[0][col].walls[south] = permanentwall
+		problems = findProblems(m, examples=2)
+		self.assert_('4 cells have a permanent wall to the north inside the maze: (1, 0), (1, 1), ...' in problems)
+		self.assert_('4 cells have a permanent wall to the south inside the maze: (0, 0), (0, 1), ...' in problems)
+
+	def testPermanentWallsAlongTheEdgesAreFine(self):
+		m = Maze(3,3)
+		HuntAndKillGenerator(m, rng=1).generate()
+		for cell in m.iterCells():
+			for direction in directions:
+				if cell.getAdjacentCell(direction) == None: cell.walls[direction] = permanentwall
+		self.assertEqual([], findProblems(m))
+
+	def testPassagesOffTheEdge(self):
+		m = Maze(2,2)
+		HuntAndKillGenerator(m, rng=1).generate()
+		m.cells[0][1].walls[north] = passage
+		m.cells[1][1].walls[east] = passage
+		self.assertEqual(['1 cell has a passage north off the edge of the maze: (0, 1)',
+						  '1 cell has a passage east off the edge of the maze: (1, 1)'], findProblems(m))
+
+
+if __name__ == '__main__':
+	unittest.main()